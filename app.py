@@ -1,9 +1,23 @@
 import streamlit as st
 import pandas as pd
 import altair as alt
+import numpy as np
 import os
-import re
+import time
 import base64
+import io
+import json
+import re
+
+from engine import (
+    EXPORT_FORMATS, FEED_SORTS, KEYWORDS, PILLARS, RATING_GROUPS, SLA_TARGET, SLA_WINDOW_MONTHS, STREAK_POINT_BUDGETS,
+    LiveDataset, MultiSourceDataset, QueryCache, SharedDataset, choose_grain, cluster_sizes, collapse_clusters,
+    count_hits, downsample_streak, export_chunks, five_star_streaks, headline_metrics, in_order, memory_report,
+    normalize_query, parse_sources, pillar_mix, query_rollup, render_feed_cards, rolling_sla, rolling_streak,
+    score_distribution, sla_summary, source_mtime, streak_distribution,
+)
+from instrumentation import REGISTRY, RerunTrace, tracked_cache
+from PIL import Image, ImageOps
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(
@@ -13,284 +27,173 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# --- HELPER: BASE64 IMAGE LOADER ---
-def get_img_as_base64(file_path):
-    if os.path.exists(file_path):
-        with open(file_path, "rb") as f:
-            data = f.read()
-        return base64.b64encode(data).decode()
-    return ""
+# --- INSTRUMENTATION ---
+# Spans are always recorded; ?debug=1 (or DASHBOARD_DEBUG=1) shows the panel and
+# measures exact chart spec sizes, which costs an extra serialization per chart.
+trace = RerunTrace()
+DEBUG_PANEL = os.environ.get('DASHBOARD_DEBUG') == '1' or st.query_params.get('debug') == '1'
+
+
+def show_chart(chart, name, rows):
+    with trace.span(f"chart:{name}", rows=rows):
+        st.altair_chart(chart, use_container_width=True)
+    if DEBUG_PANEL:
+        # Altair refuses to inline more than 5000 rows; st.altair_chart does not go
+        # through that check, so the measurement must not either
+        with alt.data_transformers.disable_max_rows():
+            trace.add_payload(f"chart:{name}", chart.to_json())
+
+
+def show_html(html, name):
+    trace.add_payload(name, html)
+    st.markdown(html, unsafe_allow_html=True)
+
+# --- STATIC ASSETS ---
+# Encoded once per file version (mtime is part of the cache key) instead of per rerun
+PROFILE_IMAGE = "profile.jpg"
+PROFILE_IMAGE_PX = 300  # 2x the 150px display size, for high-DPI screens
+STYLE_FILE = "style.css"
+
+
+@tracked_cache(st.cache_data(max_entries=4))
+def profile_image_b64(file_path, mtime):
+    if mtime is None:
+        return ""
+    with Image.open(file_path) as img:
+        thumb = ImageOps.fit(img.convert("RGB"), (PROFILE_IMAGE_PX, PROFILE_IMAGE_PX))
+    buf = io.BytesIO()
+    thumb.save(buf, format="JPEG", quality=85, optimize=True)
+    return base64.b64encode(buf.getvalue()).decode()
+
+
+@tracked_cache(st.cache_data(max_entries=4))
+def app_css(file_path, mtime):
+    with open(file_path, encoding="utf-8") as f:
+        css = f.read()
+    # Strip comments and indentation; the block is re-sent on every rerun
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s*\n\s*", "", css)
+    return f"<style>{css}</style>"
+
 
 # --- THE BRAND & UI ENGINE (CSS) ---
-st.markdown("""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Figtree:wght@300;400;500;600;700&display=swap');
-    
-    html, body, [class*="css"] {
-        font-family: 'Figtree', sans-serif;
-        color: #1e293b;
-    }
-
-    :root {
-        --primary-color: #4338ca;
-        --text-color: #1e293b;
-    }
-
-    span[data-baseweb="tag"] {
-        background-color: #e0e7ff !important;
-        border: 1px solid #4338ca !important;
-    }
-    span[data-baseweb="tag"] span {
-        color: #4338ca !important; 
-        font-weight: 600 !important;
-    }
-    span[data-baseweb="tag"] svg {
-        fill: #4338ca !important;
-    }
-
-    div[data-testid="stCheckbox"] label span[aria-checked="true"] {
-        background-color: #4338ca !important;
-        border-color: #4338ca !important;
-    }
-    div[data-testid="stCheckbox"] label span[aria-checked="false"] {
-        border-color: #4338ca !important;
-        background-color: white !important;
-    }
-
-    button[data-testid="stSidebarCollapsedControl"] {
-        color: #4338ca !important;
-        background-color: #f1f5f9 !important;
-        border: 2px solid #4338ca !important;
-        border-radius: 8px !important;
-        height: 45px !important;
-        width: 45px !important;
-        padding: 5px !important;
-    }
-    button[data-testid="stSidebarCollapsedControl"] svg, 
-    button[data-testid="stSidebarCollapsedControl"] svg path {
-        fill: #4338ca !important;
-        stroke: #4338ca !important;
-    }
-
-    .stMultiSelect div[data-baseweb="select"] > div {
-        max-height: none !important;
-        overflow-y: visible !important;
-        white-space: normal !important;
-    }
-    .stMultiSelect span[data-baseweb="tag"] {
-        margin-bottom: 5px !important;
-    }
-
-    button[data-baseweb="tab"] { 
-        font-size: 26px !important; 
-        font-weight: 700 !important; 
-        color: #64748b !important; 
-        padding: 12px 20px !important;
-    }
-    button[data-baseweb="tab"][aria-selected="true"] { 
-        color: #4338ca !important; 
-        border-bottom-color: #4338ca !important; 
-    }
-    div[data-baseweb="tab-list"] { 
-        padding: 15px 0; 
-        border-bottom: 3px solid #f1f5f9; 
-    }
-
-    .carousel-card {
-        background: linear-gradient(135deg, #4338ca 0%, #6366f1 100%);
-        color: white;
-        padding: 28px;
-        border-radius: 16px;
-        margin: 0 0 35px 0;
-    }
-    .carousel-label {
-        font-size: 0.8rem;
-        font-weight: 700;
-        letter-spacing: 1.5px;
-        margin-bottom: 10px;
-        opacity: 0.9;
-    }
-    .carousel-quote {
-        font-size: 1.4rem;
-        font-style: italic;
-        font-weight: 500;
-    }
-    .carousel-author {
-        margin-top: 12px;
-        font-weight: 700;
-    }
-
-    .review-card {
-        background-color: #ffffff;
-        padding: 24px;
-        border-radius: 16px;
-        border: 1px solid #e2e8f0;
-        margin-bottom: 20px;
-        text-align: left;
-    }
-    .no-review {
-        color: #64748b;
-        font-style: italic;
-        font-size: 14px;
-    }
-
-    div[data-testid="stDownloadButton"] button {
-        background-color: #4338ca !important;
-        color: white !important;
-        border: none !important;
-        font-weight: 600 !important;
-    }
-    div[data-testid="stDownloadButton"] button:hover {
-        background-color: #3730a3 !important;
-    }
-
-    .streak-callout {
-        background: linear-gradient(135deg, #f0fdf4 0%, #dcfce7 100%);
-        border: 1px solid #86efac;
-        border-radius: 12px;
-        padding: 16px 24px;
-        text-align: center;
-        margin-bottom: 20px;
-    }
-    .streak-number {
-        font-size: 2.5rem;
-        font-weight: 700;
-        color: #16a34a;
-        line-height: 1;
-    }
-    .streak-label {
-        font-size: 0.95rem;
-        color: #475569;
-        margin-top: 4px;
-    }
-
-    /* Metrics Row */
-    .metrics-row {
-        display: flex;
-        justify-content: space-between;
-        text-align: center;
-        padding: 10px 0 20px 0;
-    }
-    .metric-item {
-        flex: 1;
-    }
-    .metric-label {
-        font-size: 0.875rem;
-        color: #64748b;
-        font-weight: 500;
-    }
-    .metric-value {
-        font-size: 2.25rem;
-        font-weight: 700;
-        color: #1e293b;
-        line-height: 1.2;
-    }
-    .metric-delta {
-        font-size: 0.875rem;
-        font-weight: 600;
-        color: #16a34a;
-        height: 1.25rem;
-    }
-    .metric-spacer {
-        height: 1.25rem;
-    }
-
-    /* Sidebar spacing */
-    section[data-testid="stSidebar"] hr {
-        margin-top: 0.5rem !important;
-        margin-bottom: 0.5rem !important;
-    }
-    section[data-testid="stSidebar"] .stExpander {
-        margin-top: 0 !important;
-        margin-bottom: 0 !important;
-    }
-    section[data-testid="stSidebar"] div[data-testid="stVerticalBlock"] > div {
-        padding-top: 0 !important;
-        padding-bottom: 0 !important;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+show_html(app_css(STYLE_FILE, source_mtime(STYLE_FILE)), 'css')
 
 
 # --- DATA LOADING ---
-@st.cache_data
-def load_data():
-    file_path = 'taskrabbit_reviews_clean.csv'
-    
-    if os.path.exists(file_path):
-        df = pd.read_csv(file_path)
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-        df['Rating'] = pd.to_numeric(df['Rating'], errors='coerce')
-    else:
-        data = {
-            'Category': [
-                'Arts / Crafts', 'Errands', 'Arts / Crafts', 'Arts / Crafts', 'Computer Help',
-                'Errands', 'Event Staffing', 'Arts / Crafts', 'Packing & Unpacking', 'Computer Help',
-                'Event Staffing', 'Event Staffing', 'Photography', 'Computer Help', 'Packing & Unpacking',
-            ],
-            'Date': [
-                '2025-12-23', '2025-12-21', '2025-12-21', '2025-12-20', '2025-12-19',
-                '2025-12-14', '2025-12-12', '2025-12-09', '2025-12-06', '2025-12-06',
-                '2025-12-02', '2025-11-23', '2025-11-16', '2025-11-14', '2025-10-29',
-            ],
-            'Client Name': [
-                'Pat B.', 'Kara Keating B.', 'Holly H.', 'Jeffrey G.', 'Miriam O.',
-                'Carine C.', 'Shanti F.', 'Carl D.', 'Chris V.', 'Kathy D.',
-                'Paula O.', 'Benjamin M.', 'Todd H.', 'Scott S.', 'Eri S.',
-            ],
-            'Rating': [5.0, 5.0, 5.0, 5.0, 5.0, 5.0, 5.0, 5.0, 5.0, 5.0, 5.0, 5.0, 5.0, 5.0, 5.0],
-            'Review': [
-                "Lauren is very professional and does a great job. I highly recommend!",
-                "Saved the day with a prompt gift wrapping job. Followed all instructions!",
-                "Lauren is lovely to work with. Excellent communication and great attention to detail.",
-                "Lauren was great. Great communication went over and out of her way to help when needed. Can't recommend her enough.",
-                "Lauren was great at communication... relaxed yet very efficient, and got the job done.",
-                "Lauren is a pleasure to work with. She was also very responsive throughout our communication.",
-                "Lauren has now done three events at our house. She is terrific and such a pleasure to work with.",
-                "Lauren is extremely talented and professional. She completed the entire task with great care.",
-                "Very easy and friendly. Highly recommended.",
-                "She is really good!",
-                "She did an absolutely fantastic job decorating my trees! She worked quickly and efficiently.",
-                "Lauren was excellent. Super communicative, friendly, and great to work with.",
-                "No text provided",
-                "Lauren is smart, pleasant and tenacious. Great combo! Hire her!! Very pleased.",
-                "Lauren went above and beyond. Much appreciated.",
-            ]
-        }
-        df = pd.DataFrame(data)
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-        df['Rating'] = pd.to_numeric(df['Rating'], errors='coerce')
-
-    def map_domains(category):
-        cat = str(category).lower()
-        if 'computer' in cat or 'technical' in cat:
-            return 'Technical Support'
-        elif any(x in cat for x in ['packing', 'moving', 'organization']):
-            return 'Logistics'
-        elif 'assistant' in cat or 'staffing' in cat:
-            return 'Operations'
-        elif 'photo' in cat:
-            return 'Visual Media'
-        return 'General Ops'
-    
-    df['Domain'] = df['Category'].apply(map_domains)
-    return df
+# With a snapshot directory set, every worker process on the host maps one published copy
+SNAPSHOT_DIR = os.environ.get('DASHBOARD_SNAPSHOT_DIR')
+# Several exports (files, directories, http(s) URLs), refreshed in the background
+SOURCES = parse_sources(os.environ.get('DASHBOARD_SOURCES'))
+
+
+@tracked_cache(st.cache_resource)
+def load_dataset():
+    if SNAPSHOT_DIR:
+        return SharedDataset(SNAPSHOT_DIR, sources=SOURCES)
+    return MultiSourceDataset(SOURCES) if SOURCES else LiveDataset()
+
+# One per process; CSV appends, inbox batches and domain rule edits are folded in by poll()
+with trace.span('load'):
+    dataset = load_dataset()
+    trace.add_rows('ingest', dataset.poll())
+    features = dataset.features
+df = features['frame']
+trace.add_rows('load', len(df))
+search_index = features['index']
+keyword_hit_table = features['hits']
+data_version = (dataset.version,)
+# From the platform profile: every task ever completed, not only the reviewed ones in the export
+LIFETIME_TASKS = 561
+
+
+# --- HELPER: QUERY CACHE ---
+# Feed results shared by every session in this process, dropped when the data changes
+@st.cache_resource
+def query_cache():
+    return QueryCache()
+
+
+def cached_query(key, compute, name):
+    value, hit = query_cache().get_or_compute(key, compute)
+    REGISTRY.cache_event(name, hit)
+    return value
+
+
+query_cache().invalidate(data_version)
+
+
+# --- HELPER: FILTERED EXPORT ---
+# The export is serialized chunk by chunk, only after a click, and dropped again
+# once it has been downloaded. The encoded file lives in session state rather than
+# st.cache_data, which would keep a pickled copy and unpickle another per call;
+# st.download_button keeps its own copy, so it is held twice while offered.
+def export_bytes(frame, rows, fmt, export_key):
+    cached = st.session_state.get('export_data')
+    hit = cached is not None and cached[0] == export_key
+    REGISTRY.cache_event('export_bytes', hit)
+    if not hit:
+        st.session_state.export_data = None  # release the previous file before encoding
+        cached = st.session_state.export_data = (export_key, b"".join(export_chunks(frame, fmt, rows)))
+    return cached[1]
+
+
+def request_export(export_key):
+    st.session_state.export_request = export_key
+
+
+def finish_export():
+    st.session_state.export_request = None
+    st.session_state.export_data = None
+
+
+def render_export(frame, rows, export_key):
+    fmt = st.selectbox("Export format", list(EXPORT_FORMATS), key='export_format')
+    export_key = export_key + (fmt,)
+    if st.session_state.get('export_request') != export_key:
+        st.session_state.export_data = None  # the view changed before the file was saved
+        st.button(
+            f"📥 Download {len(rows):,} Reviews", on_click=request_export, args=(export_key,),
+            disabled=len(rows) == 0, use_container_width=True
+        )
+        return
+    with trace.span('export', rows=len(rows)):
+        data = export_bytes(frame, rows, fmt, export_key)
+    trace.add_payload('export', data)
+    ext, mime = EXPORT_FORMATS[fmt]
+    st.download_button(
+        f"💾 Save {fmt} ({len(data) / 1024:,.0f} KB)", data, f"Lauren_Chagaris_Verified_Reviews.{ext}",
+        mime=mime, on_click=finish_export, use_container_width=True
+    )
+
+
+# --- HELPER: AUDIT FEED PAGING ---
+FEED_PAGE_SIZES = [10, 25, 50, 100]
+# Pager labels for the date orders; other orders page as Previous / Next
+FEED_PAGER_LABELS = {'Newest first': ("❮ Newer", "Older ❯"), 'Oldest first': ("❮ Older", "Newer ❯")}
+
+
+def shift_feed_page(step):
+    st.session_state.feed_page = st.session_state.get('feed_page', 0) + step
 
-df = load_data()
+
+def request_feed_jump():
+    st.session_state.feed_jump_pending = True
 
 
 # ============================================================
 # SIDEBAR
 # ============================================================
 with st.sidebar:
-    img_b64 = get_img_as_base64("profile.jpg")
+    with trace.span('profile_image'):
+        img_b64 = profile_image_b64(PROFILE_IMAGE, source_mtime(PROFILE_IMAGE))
     if img_b64:
-        st.markdown(f"""
+        show_html(f"""
             <div style="display: flex; justify-content: center; margin-bottom: 20px;">
-                <img src="data:image/jpg;base64,{img_b64}" 
+                <img src="data:image/jpeg;base64,{img_b64}" 
                      style="border-radius: 50%; border: 3px solid #4338ca; width: 150px; height: 150px; object-fit: cover; display: block;">
             </div>
-        """, unsafe_allow_html=True)
+        """, 'profile_image')
         
     st.markdown("""
         <div style="text-align: center;">
@@ -319,12 +222,10 @@ with st.sidebar:
             """, unsafe_allow_html=True)
 
     if not df.empty:
-        selected_domains = st.multiselect(
-            "Domains", 
-            sorted(df['Domain'].unique()), 
-            default=sorted(df['Domain'].unique())
-        )
-        available_cats = sorted(df[df['Domain'].isin(selected_domains)]['Category'].unique())
+        # Options come from the shared filter bitmaps, never from a copy of the frame
+        all_domains = features['bitmaps'].values('Domain')
+        selected_domains = st.multiselect("Domains", all_domains, default=all_domains)
+        available_cats = features['bitmaps'].values('Category', 'Domain', selected_domains)
         with st.expander("Filter Categories", expanded=False):
             selected_cats = [c for c in available_cats if st.checkbox(c, value=True, key=f"cb_{c}")]
     else:
@@ -333,15 +234,20 @@ with st.sidebar:
     
     st.divider()
     
-    if not df.empty:
-        download_df = df[['Category', 'Date', 'Client Name', 'Rating', 'Review']].copy()
-        download_df['Date'] = download_df['Date'].dt.strftime('%Y-%m-%d')
-        st.download_button(
-            "📥 Download Reviews", 
-            download_df.to_csv(index=False).encode('utf-8'), 
-            "Lauren_Chagaris_Verified_Reviews.csv", 
-            use_container_width=True
-        )
+    # Filled in once the feed has resolved the filtered view
+    export_box = st.container()
+
+    if dataset.last_ingest:
+        added, skipped, at = dataset.last_ingest
+        st.caption(f"🔄 Last ingest {at:%H:%M}: {added} new reviews, {skipped} duplicates skipped")
+    if SOURCES and dataset.errors():
+        # A source that never loaded has no last good data to fall back on
+        missing = len(dataset.missing_sources())
+        stale = len(dataset.errors()) - missing
+        if stale:
+            st.caption(f"⚠️ {stale} of {len(SOURCES)} sources failed to refresh; showing their last good data")
+        if missing:
+            st.caption(f"⚠️ {missing} of {len(SOURCES)} sources could not be loaded; their reviews are not shown")
 
 
 # ============================================================
@@ -360,6 +266,9 @@ st.markdown("""
 if df.empty:
     st.warning("⚠️ No data loaded.")
 else:
+    with trace.span('filter', rows=len(df)):
+        filter_mask = features['bitmaps'].select(selected_domains, selected_cats)
+
     t_audit, t_analytics = st.tabs(["📂 Audit Feed", "📈 Analytics & Insights"])
 
     with t_audit:
@@ -399,32 +308,41 @@ else:
         # ============================
         # METRICS ROW (Custom HTML)
         # ============================
+        with trace.span('headline_metrics', rows=len(features['rollup'])):
+            headline = headline_metrics(features['rollup'], selected_domains, selected_cats)
+        composite = f"{headline['composite_rating']:.2f}" if headline['composite_rating'] is not None else "–"
+        five_star_delta = f"▲ {headline['five_star_share']:.0%} of rated" if headline['rated'] else ""
+        if headline['rated']:
+            risk_value = f"{headline['risk_rate']:.1%}"
+            risk_delta = f"95% CI {headline['risk_low']:.1%}–{headline['risk_high']:.1%}"
+        else:
+            risk_value, risk_delta = "–", ""
         st.markdown(f"""
             <div class="metrics-row">
                 <div class="metric-item">
                     <div class="metric-label">Lifetime Tasks</div>
-                    <div class="metric-value">561</div>
+                    <div class="metric-value">{LIFETIME_TASKS}</div>
                     <div class="metric-spacer"></div>
                 </div>
                 <div class="metric-item">
                     <div class="metric-label">Verified Sample</div>
-                    <div class="metric-value">{len(df)}</div>
+                    <div class="metric-value">{headline['reviews']}</div>
                     <div class="metric-spacer"></div>
                 </div>
                 <div class="metric-item">
                     <div class="metric-label">Composite Rating</div>
-                    <div class="metric-value">4.94</div>
+                    <div class="metric-value">{composite}</div>
                     <div class="metric-spacer"></div>
                 </div>
                 <div class="metric-item">
                     <div class="metric-label">5-Star Tasks</div>
-                    <div class="metric-value">310</div>
-                    <div class="metric-delta">▲ Top 1% Rank</div>
+                    <div class="metric-value">{headline['five_star']}</div>
+                    <div class="metric-delta">{five_star_delta}</div>
                 </div>
                 <div class="metric-item">
                     <div class="metric-label">Operational Risk</div>
-                    <div class="metric-value">Negligible</div>
-                    <div class="metric-delta">▼ ~3% Risk</div>
+                    <div class="metric-value">{risk_value}</div>
+                    <div class="metric-delta">{risk_delta}</div>
                 </div>
             </div>
         """, unsafe_allow_html=True)
@@ -436,45 +354,122 @@ else:
         # ============================
         search = st.text_input(
             f"🔍 Search {len(df)} verified records...", 
-            placeholder="Filter by keyword..."
+            placeholder='Filter by keyword... (all terms must match, "quoted" for exact phrases)'
         )
-        
-        filtered_df = df[
-            (df['Domain'].isin(selected_domains)) & 
-            (df['Category'].isin(selected_cats))
-        ].sort_values('Date', ascending=False)
-        
+        s_sort, s_rank, s_dupes = st.columns([2, 2, 2])
+        with s_sort:
+            sort_by = st.selectbox("Sort by", list(FEED_SORTS), key='feed_sort', label_visibility="collapsed")
+        with s_rank:
+            rank_results = st.checkbox("Rank by relevance", value=False)
+        with s_dupes:
+            collapse = st.checkbox("Collapse near-duplicates", value=False, key='collapse_dupes')
+        ranked = bool(search) and rank_results
+        sort_column, sort_descending = FEED_SORTS[sort_by]
+        order = features['orders'][sort_by]
+
+        # The feed works on row positions into the shared frame; only the page is materialized
+        query_state = (
+            tuple(selected_domains), tuple(selected_cats), normalize_query(search) if search else None, ranked, sort_by,
+        )
+        query_key = data_version + query_state
+
+        def query_rows():
+            if not search:
+                return in_order(order, filter_mask)
+            hits = search_index.search(search, rank=rank_results)
+            if ranked:
+                return hits[filter_mask[hits]]
+            hit_mask = np.zeros(len(df), dtype=bool)
+            hit_mask[hits] = True
+            return in_order(order, hit_mask & filter_mask)
+
         if search:
-            filtered_df = filtered_df[
-                filtered_df['Review'].str.contains(search, case=False, na=False)
-            ]
-
-        if not filtered_df.empty:
-            st.write(f"**Showing {len(filtered_df)} verified records**")
-            for _, row in filtered_df.iterrows():
-                d_str = row['Date'].strftime('%B %d, %Y')
-                stars = "★" * int(round(row['Rating']))
-                rev = str(row['Review']).strip()
-                
-                clean_check = re.sub(r'[^\w\s]', '', rev.lower())
-                if clean_check in ['nan', 'none', 'null', 'no text provided', 'no review', '']:
-                    rev_html = '<div class="no-review">No written review provided.</div>'
-                else:
-                    rev_html = f'<div>"{rev}"</div>'
-
-                st.markdown(f"""
-                    <div class="review-card">
-                        <div style="display: flex; justify-content: space-between; align-items: center;">
-                            <div>
-                                <span style="font-size: 0.75rem; font-weight: 600; color: #64748b; text-transform: uppercase; letter-spacing: 0.5px;">{row['Domain']}</span>
-                            </div>
-                            <span style="color:#FBBF24; font-size:1.1rem;">{stars}</span>
-                        </div>
-                        <div style="font-weight:700; font-size:1.1rem; margin: 4px 0 2px 0;">{row['Client Name']}</div>
-                        <div style="font-size:0.9rem; color:#64748b; margin: 0 0 12px 0;">📅 {d_str} • {row['Category']}</div>
-                        {rev_html}
-                    </div>
-                """, unsafe_allow_html=True)
+            q_start = time.perf_counter()
+            with trace.span('search'):
+                match_rows = cached_query(query_key, query_rows, 'query_rows')
+            trace.add_rows('search', len(match_rows))
+            st.caption(
+                f"{len(match_rows)} matches in {(time.perf_counter() - q_start) * 1000:.1f} ms · "
+                f"index of {search_index.n_terms:,} terms built in {search_index.build_seconds * 1000:.0f} ms"
+            )
+        else:
+            with trace.span('filter_sort'):
+                match_rows = cached_query(query_key, query_rows, 'query_rows')
+            trace.add_rows('filter_sort', len(match_rows))
+
+        # The feed can show the first review of each near-duplicate cluster, with how many
+        # other matching reviews it stands for; exports keep every row
+        if collapse:
+            clusters = df['Cluster'].to_numpy()
+            with trace.span('collapse', rows=len(match_rows)):
+                view_rows, view_counts = cached_query(
+                    query_key + ('collapsed',), lambda: collapse_clusters(match_rows, clusters), 'query_rows'
+                )
+        else:
+            view_rows, view_counts = match_rows, None
+
+        with export_box:
+            render_export(df, match_rows, query_key)
+
+        if len(view_rows):
+            # Reset to the first page whenever the result set changes
+            page_size = st.session_state.get('feed_page_size', FEED_PAGE_SIZES[0])
+            feed_key = query_state + (collapse, page_size)
+            if st.session_state.get('feed_key') != feed_key:
+                st.session_state.feed_key = feed_key
+                st.session_state.feed_page = 0
+
+            total = len(view_rows)
+            n_pages = (total - 1) // page_size + 1
+            # Jumping to a date only makes sense while the feed is in date order
+            date_sorted = sort_column == 'Date' and not ranked
+            if date_sorted:
+                view_dates = pd.Series(df['Date'].to_numpy()[view_rows])
+
+            if st.session_state.pop('feed_jump_pending', False) and st.session_state.get('feed_jump') and date_sorted:
+                # The target row is the first one on/before the date (newest first) or on/after it (oldest first)
+                jump = pd.Timestamp(st.session_state.feed_jump)
+                before = view_dates > jump if sort_descending else view_dates < jump
+                st.session_state.feed_page = min(int(before.sum()), total - 1) // page_size
+
+            page = min(max(st.session_state.get('feed_page', 0), 0), n_pages - 1)
+            st.session_state.feed_page = page
+            start, stop = page * page_size, min((page + 1) * page_size, total)
+
+            prev_label, next_label = FEED_PAGER_LABELS.get(None if ranked else sort_by, ("❮ Previous", "Next ❯"))
+            p_prev, p_label, p_next, p_size, p_jump = st.columns([1, 2, 1, 2, 2])
+            with p_prev:
+                st.button(prev_label, on_click=shift_feed_page, args=(-1,), disabled=page == 0, use_container_width=True)
+            with p_label:
+                st.markdown(
+                    f"<p style='text-align: center; margin-top: 6px;'>Page {page + 1} of {n_pages}</p>",
+                    unsafe_allow_html=True,
+                )
+            with p_next:
+                st.button(next_label, on_click=shift_feed_page, args=(1,), disabled=page >= n_pages - 1, use_container_width=True)
+            with p_size:
+                st.selectbox("Per page", FEED_PAGE_SIZES, key='feed_page_size', label_visibility="collapsed")
+            with p_jump:
+                if date_sorted:
+                    st.date_input(
+                        "Jump to date",
+                        value=None,
+                        min_value=view_dates.min(),
+                        max_value=view_dates.max(),
+                        key='feed_jump',
+                        on_change=request_feed_jump,
+                        label_visibility="collapsed",
+                    )
+
+            st.write(f"**Showing {start + 1}–{stop} of {total} verified records**")
+            with trace.span('feed_render', rows=stop - start):
+                feed_html = cached_query(
+                    query_key + (collapse, start, stop),
+                    lambda: render_feed_cards(
+                        df.iloc[view_rows[start:stop]], None if view_counts is None else view_counts[start:stop] - 1
+                    ), 'feed_page'
+                )
+            show_html(feed_html, 'feed_html')
 
     # ============================
     # ANALYTICS TAB
@@ -483,44 +478,35 @@ else:
         st.markdown("### 📊 Operational Insights")
         st.divider()
         
-        text_corpus = " ".join(df['Review'].astype(str).tolist()).lower()
-
         # 1. FIVE-STAR STREAK TIMELINE
         st.markdown("#### 🔥 Five-Star Consistency Streak")
         st.caption("Each bar is a verified review in chronological order. Longest unbroken five-star streak highlighted below.")
         
-        df_sorted = df.sort_values(by='Date').reset_index(drop=True)
-        df_sorted['Review #'] = range(1, len(df_sorted) + 1)
-        
-        def get_bar_color(rating):
-            if rating == 5.0:
-                return '5 Star'
-            elif rating == 4.0:
-                return '4 Star'
-            else:
-                return '1-2 Star'
-        
-        df_sorted['Rating Group'] = df_sorted['Rating'].apply(get_bar_color)
-        
-        streak = 0
-        max_streak = 0
-        for _, row in df_sorted.iterrows():
-            if row['Rating'] == 5.0:
-                streak += 1
-                max_streak = max(max_streak, streak)
-            else:
-                streak = 0
-        
+        with trace.span('streaks'):
+            df_sorted = features['chronological']
+            df_sorted = df_sorted[filter_mask[features['chrono_order']]]
+            streaks = five_star_streaks(df_sorted)
+            max_streak = int(streaks['Length'].max()) if not streaks.empty else 0
+            current_streak = int(rolling_streak(df_sorted['Rating'])[-1]) if not df_sorted.empty else 0
+        trace.add_rows('streaks', len(df_sorted))
+        n_reviews = len(features['chronological'])
+        tick_step = 20 * max(1, n_reviews // 500)
+
+        point_budget = st.select_slider("Chart point budget", options=STREAK_POINT_BUDGETS, value=STREAK_POINT_BUDGETS[1])
+        with trace.span('downsample', rows=len(df_sorted)):
+            exact_points, five_buckets = downsample_streak(df_sorted, point_budget)
+
         color_scale = alt.Scale(
-            domain=['5 Star', '4 Star', '1-2 Star'],
+            domain=RATING_GROUPS,
             range=['#22c55e', '#f59e0b', '#ef4444']
         )
-        
-        streak_chart = alt.Chart(df_sorted).mark_bar(size=4).encode(
+        x_scale = alt.Scale(domain=[0, n_reviews + 1])
+
+        bars = alt.Chart(exact_points).mark_bar(size=4).encode(
             x=alt.X('Review #:Q', 
                      title='Review (Chronological Order)',
-                     scale=alt.Scale(domain=[0, len(df_sorted) + 1]),
-                     axis=alt.Axis(values=list(range(20, len(df_sorted), 20)))
+                     scale=x_scale,
+                     axis=alt.Axis(values=list(range(tick_step, n_reviews, tick_step)))
             ),
             y=alt.Y('Rating:Q', 
                      title='Rating', 
@@ -531,11 +517,31 @@ else:
                            legend=alt.Legend(title='Rating', orient='top')
             ),
             tooltip=['Client Name:N', 'Date:T', 'Rating:Q', 'Category:N']
-        ).properties(height=280).configure_view(
+        )
+        # Shade the longest streak(s) behind the bars
+        longest = alt.Chart(streaks[streaks['Length'] == max_streak]).mark_rect(
+            color='#22c55e', opacity=0.15
+        ).encode(
+            x=alt.X('Start #:Q', scale=x_scale),
+            x2='End #:Q',
+            tooltip=['Start:T', 'End:T', 'Length:Q', 'Broken By:Q']
+        )
+        bucket_bars = alt.Chart(five_buckets).mark_bar().encode(
+            x=alt.X('Review #:Q', scale=x_scale),
+            x2='Review # End:Q',
+            y='Rating:Q',
+            color=alt.Color('Rating Group:N', scale=color_scale),
+            tooltip=['From:T', 'To:T', 'Reviews:Q', 'Rating:Q']
+        )
+        streak_chart = alt.layer(longest, bucket_bars, bars).properties(height=280).configure_view(
             strokeWidth=0
         )
         
-        st.altair_chart(streak_chart, use_container_width=True)
+        show_chart(streak_chart, 'streak', len(exact_points) + len(five_buckets))
+        st.caption(
+            f"Chart sends {len(exact_points) + len(five_buckets):,} marks for {len(df_sorted):,} reviews "
+            f"(budget {point_budget:,}; every non-5-star review is drawn exactly)."
+        )
         
         st.markdown(f"""
             <div class="streak-callout">
@@ -544,49 +550,195 @@ else:
             </div>
         """, unsafe_allow_html=True)
 
+        with st.expander(f"All five-star streaks ({len(streaks)}) · current run: {current_streak}", expanded=False):
+            s1, s2 = st.columns([3, 2])
+            with s1:
+                st.dataframe(
+                    streaks.sort_values('Length', ascending=False),
+                    hide_index=True,
+                    use_container_width=True,
+                )
+            with s2:
+                dist_chart = alt.Chart(streak_distribution(streaks)).mark_bar(color='#22c55e').encode(
+                    x=alt.X('Length:O', title='Streak length'),
+                    y=alt.Y('Streaks:Q', title='Streaks'),
+                ).properties(height=250)
+                show_chart(dist_chart, 'streak_distribution', len(streaks))
+
         st.divider()
 
-        # 2. DUAL DNA ANALYSIS
+        # 2. LONGITUDINAL TREND
+        st.markdown("#### 📅 Longitudinal Trend")
+        st.caption("Aggregated from a pre-built rollup cube; the time grain adapts to the selected date range.")
+
+        dated = df['Date'].dropna()
+        if not dated.empty:
+            t1, t2 = st.columns([3, 1])
+            with t1:
+                trend_range = st.slider(
+                    "Date range",
+                    min_value=dated.min().date(),
+                    max_value=dated.max().date(),
+                    value=(dated.min().date(), dated.max().date()),
+                    format="MMM YYYY",
+                )
+            with t2:
+                trend_metric = st.selectbox(
+                    "Metric",
+                    ['Reviews', 'Mean Rating', '5-Star Share', 'Risk Rate'] + [f"{pillar} Rate" for pillar in PILLARS],
+                )
+            grain = choose_grain(*trend_range)
+            with trace.span('rollup_query', rows=len(features['rollup'])):
+                trend_df = query_rollup(features['rollup'], grain, selected_domains, selected_cats, *trend_range)
+            trend_mark = alt.Chart(trend_df).mark_bar(color='#6366f1') if trend_metric == 'Reviews' \
+                else alt.Chart(trend_df).mark_line(color='#6366f1', point=True)
+            trend_chart = trend_mark.encode(
+                x=alt.X('Period:T', title=f"{grain.title()}"),
+                y=alt.Y(f"{trend_metric}:Q", title=trend_metric),
+                tooltip=['Period:T', 'Reviews:Q', alt.Tooltip('Mean Rating:Q', format='.2f'),
+                         alt.Tooltip('5-Star Share:Q', format='.0%')]
+            ).properties(height=280).configure_view(
+                strokeWidth=0
+            )
+            show_chart(trend_chart, 'trend', len(trend_df))
+
+        st.divider()
+
+        # 3. DUAL DNA ANALYSIS
+        # Templated reviews would otherwise count once per copy
+        weight_dupes = st.checkbox("Count near-duplicate reviews once", value=True, key='weight_dupes')
+        # Cluster sizes within the sidebar filter, so members outside it don't dilute the counts
+        hit_weights = 1 / cluster_sizes(df['Cluster'].to_numpy(), filter_mask).clip(1) if weight_dupes else None
         c1, c2 = st.columns(2)
         with c1:
             st.markdown("#### 🧠 Operational Pillars")
             st.caption("Strategic grouping of synonyms for high-level trait mapping.")
             
-            pillar_data = {
-                "Execution Velocity": text_corpus.count("fast") + text_corpus.count("quick") + text_corpus.count("speed") + text_corpus.count("efficient") + text_corpus.count("efficiency"),
-                "Composure (Calm/Easy)": text_corpus.count("calm") + text_corpus.count("easy") + text_corpus.count("patient") + text_corpus.count("stress-free"),
-                "Communication Clarity": text_corpus.count("communicat") + text_corpus.count("talk") + text_corpus.count("conversation"),
-                "Interpersonal IQ": text_corpus.count("nice") + text_corpus.count("friendly") + text_corpus.count("kind"),
-                "High-Stakes Quality": text_corpus.count("recommend") + text_corpus.count("perfect") + text_corpus.count("fantastic") + text_corpus.count("wonderful"),
-            }
+            with trace.span('keyword_counts', rows=len(keyword_hit_table)):
+                pillar_data = count_hits(keyword_hit_table, PILLARS, filter_mask, hit_weights)
             pillar_df = pd.DataFrame(list(pillar_data.items()), columns=['Pillar', 'Mentions'])
             pillar_chart = alt.Chart(pillar_df).mark_bar(color='#6366f1').encode(
                 x='Mentions:Q', 
                 y=alt.Y('Pillar:N', sort='-x', title='')
             ).properties(height=350).configure_axis(labelLimit=300)
-            st.altair_chart(pillar_chart, use_container_width=True)
+            show_chart(pillar_chart, 'pillars', len(pillar_df))
 
         with c2:
             st.markdown("#### 🗣️ Raw Keyword Frequency")
             st.caption("Direct 'Word of Mouth' terminology extracted from records.")
             
-            keyword_data = {
-                "Great": text_corpus.count("great"),
-                "Recommend": text_corpus.count("recommend"),
-                "Helpful": text_corpus.count("helpful"),
-                "Professional": text_corpus.count("professional"),
-                "Efficient": text_corpus.count("efficient"),
-                "Communication": text_corpus.count("communicat"),
-                "Quick/Fast": text_corpus.count("quick") + text_corpus.count("fast"),
-                "Easy": text_corpus.count("easy"),
-                "Excellent": text_corpus.count("excellent"),
-                "Friendly": text_corpus.count("friendly"),
-                "Amazing": text_corpus.count("amazing"),
-                "Wonderful": text_corpus.count("wonderful"),
-            }
+            with trace.span('keyword_counts', rows=len(keyword_hit_table)):
+                keyword_data = count_hits(keyword_hit_table, KEYWORDS, filter_mask, hit_weights)
             raw_df = pd.DataFrame(list(keyword_data.items()), columns=['Keyword', 'Count'])
             raw_chart = alt.Chart(raw_df).mark_bar(color='#6366f1').encode(
                 x='Count:Q', 
                 y=alt.Y('Keyword:N', sort='-x', title='')
             ).properties(height=350).configure_axis(labelLimit=300)
-            st.altair_chart(raw_chart, use_container_width=True)
\ No newline at end of file
+            show_chart(raw_chart, 'keywords', len(raw_df))
+
+        st.divider()
+
+        # 4. REVIEW SCORING
+        st.markdown("#### 💬 Sentiment & Pillar Mix")
+        st.caption("Per-review lexicon sentiment (−1 to +1) and most-mentioned pillar, scored once per review and cached.")
+
+        score_by = st.radio("Group by", ['Domain', 'Category'], horizontal=True, key='score_by')
+        with trace.span('score_distribution', rows=len(features['sentiment_rollup'])):
+            sentiment_df = score_distribution(features['sentiment_rollup'], score_by, selected_domains, selected_cats)
+            mix_df = pillar_mix(features['pillar_rollup'], score_by, selected_domains, selected_cats)
+
+        s1, s2 = st.columns(2)
+        with s1:
+            sentiment_chart = alt.Chart(sentiment_df).mark_rect().encode(
+                x=alt.X('Sentiment:O', title='Sentiment', axis=alt.Axis(format='+.1f', labelAngle=0)),
+                y=alt.Y('Group:N', title='', sort=alt.EncodingSortField('Mean Sentiment', order='descending')),
+                color=alt.Color('Share:Q', scale=alt.Scale(scheme='purples'), legend=alt.Legend(format='.0%')),
+                tooltip=['Group:N', alt.Tooltip('Sentiment:Q', format='+.1f'), 'Reviews:Q',
+                         alt.Tooltip('Share:Q', format='.0%'), alt.Tooltip('Mean Sentiment:Q', format='+.2f')]
+            ).properties(height=350).configure_axis(labelLimit=300)
+            show_chart(sentiment_chart, 'sentiment', len(sentiment_df))
+        with s2:
+            mix_chart = alt.Chart(mix_df).mark_bar().encode(
+                x=alt.X('Reviews:Q', stack='normalize', title='Share of reviews', axis=alt.Axis(format='%')),
+                y=alt.Y('Group:N', title=''),
+                color=alt.Color('Top Pillar:N', scale=alt.Scale(scheme='tableau10'), legend=alt.Legend(orient='bottom', columns=2)),
+                tooltip=['Group:N', 'Top Pillar:N', 'Reviews:Q']
+            ).properties(height=350).configure_axis(labelLimit=300)
+            show_chart(mix_chart, 'pillar_mix', len(mix_df))
+
+        st.divider()
+
+        # 5. SLA RELIABILITY
+        st.markdown("#### 🛡️ SLA Reliability")
+        st.caption(
+            f"Share of rated tasks at 4+ stars over a trailing {SLA_WINDOW_MONTHS}-month window. The SLA score is "
+            f"the lower 95% confidence bound, so a group meets the {SLA_TARGET:.0%} target only with enough evidence."
+        )
+        sla_by = st.radio("Group by", ['Domain', 'Category'], horizontal=True, key='sla_by')
+        with trace.span('rolling_sla', rows=len(features['rollup'])):
+            sla_df = rolling_sla(features['rollup'], sla_by, selected_domains, selected_cats)
+            sla_now = sla_summary(sla_df)
+        if sla_df.empty:
+            st.info("No rated, dated reviews in the current selection.")
+        else:
+            l1, l2 = st.columns([3, 2])
+            with l1:
+                sla_lines = alt.Chart(sla_df).mark_line().encode(
+                    x=alt.X('Period:T', title='Window ending'),
+                    y=alt.Y('SLA Score:Q', title='SLA score', scale=alt.Scale(domain=[0, 1]), axis=alt.Axis(format='%')),
+                    color=alt.Color('Group:N', scale=alt.Scale(scheme='tableau10'), legend=alt.Legend(orient='bottom', columns=2)),
+                    tooltip=['Group:N', 'Period:T', 'Rated:Q', 'At Risk:Q', alt.Tooltip('Reliability:Q', format='.1%'),
+                             alt.Tooltip('SLA Score:Q', format='.1%')]
+                )
+                sla_target = alt.Chart(pd.DataFrame({'Target': [SLA_TARGET]})).mark_rule(
+                    color='#dc2626', strokeDash=[4, 4]
+                ).encode(y='Target:Q')
+                sla_chart = (sla_lines + sla_target).properties(height=320).configure_view(strokeWidth=0)
+                show_chart(sla_chart, 'sla', len(sla_df))
+            with l2:
+                st.dataframe(
+                    sla_now, hide_index=True, use_container_width=True,
+                    column_config={
+                        'Reliability': st.column_config.NumberColumn(format="%.3f"),
+                        'SLA Score': st.column_config.NumberColumn(format="%.3f"),
+                    },
+                )
+
+
+# ============================================================
+# DEBUG PANEL
+# ============================================================
+REGISTRY.record(trace)
+
+if DEBUG_PANEL:
+    with st.sidebar:
+        with st.expander("🛠️ Rerun Metrics", expanded=True):
+            st.caption(f"This rerun: {trace.total_seconds * 1000:.1f} ms · process total: {REGISTRY.reruns} reruns")
+            st.dataframe(trace.to_frame(), hide_index=True, use_container_width=True)
+            if trace.payloads:
+                payload_df = pd.DataFrame(list(trace.payloads.items()), columns=['Element', 'Bytes'])
+                st.dataframe(payload_df, hide_index=True, use_container_width=True)
+            for name, stats in REGISTRY.cache_stats().items():
+                st.caption(f"Cache `{name}`: {stats['hits']} hits / {stats['misses']} misses")
+            q_stats = query_cache().stats()
+            st.caption(
+                f"Query cache: {q_stats['entries']} entries, {q_stats['bytes'] / 2**20:,.2f} MiB, "
+                f"{q_stats['evictions']} evictions"
+            )
+            memory_df = memory_report(df)
+            st.caption(f"Review table: {memory_df['Bytes'].sum() / 2**20:,.1f} MiB for {len(df):,} rows")
+            st.dataframe(memory_df, hide_index=True, use_container_width=True)
+            source_status = dataset.status_frame() if SOURCES else None
+            if source_status is not None:
+                st.dataframe(source_status, hide_index=True, use_container_width=True)
+            m1, m2 = st.columns(2)
+            with m1:
+                st.download_button(
+                    "JSON", json.dumps(REGISTRY.to_dict(), indent=2), "dashboard_metrics.json",
+                    mime="application/json", use_container_width=True
+                )
+            with m2:
+                st.download_button(
+                    "Prometheus", REGISTRY.to_prometheus(), "dashboard_metrics.prom",
+                    mime="text/plain", use_container_width=True
+                )
@@ -0,0 +1,202 @@
+"""Benchmark suite for the review pipeline on synthetic corpora.
+
+Times and memory-profiles each engine stage at one or more corpus sizes and
+writes the results as JSON, optionally comparing them to an earlier run:
+
+    python benchmark.py --sizes 10000 100000 1000000 -o bench_results.json
+    python benchmark.py --sizes 100000 --baseline bench_results.json --threshold 1.25
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import engine
+from synthetic_reviews import templated_reviews, write_reviews
+
+SEARCH_QUERIES = ['great', 'communicat', 'kitchen helpful', '"highly recommended"']
+FILTER_DOMAINS = ['Logistics', 'Visual Media']
+FEED_PAGE_ROWS = 25
+
+
+def stage_plan(csv_path):
+    # Ordered (name, fn) pairs; each fn receives the shared state dict and may
+    # stash its output there for later stages.
+    store_path = engine.store_path_for(csv_path)
+
+    def load_cold(state):
+        if os.path.exists(store_path):
+            os.remove(store_path)
+        state['df'] = engine.load_data(csv_path)
+
+    def load_warm(state):
+        state['df'] = engine.load_data(csv_path)
+
+    def enrich(state):
+        # No score cache, so every repeat pays for scoring
+        state['features'] = engine.build_features(state['df'], score_cache=None)
+
+    def near_duplicates(state):
+        frame = state['features']['frame']
+        engine.NearDuplicates().assign(frame['Review'], frame['Rating'], skip=frame['Is Placeholder'])
+        if 'templated' not in state:
+            state['templated'] = templated_reviews(len(frame))
+
+    def near_duplicates_templated(state):
+        # Every review in the same few LSH buckets: must stay linear in the row count
+        texts = state['templated']
+        engine.NearDuplicates().assign(texts, np.full(len(texts), 5))
+
+    def search(state):
+        index = state['features']['index']
+        for query in SEARCH_QUERIES:
+            index.search(query, rank=True)
+
+    def filter_sort(state):
+        features = state['features']
+        mask = features['bitmaps'].select(FILTER_DOMAINS)
+        state['mask'] = mask
+        state['view'] = features['frame'].iloc[engine.in_order(features['orders']['Newest first'], mask)]
+
+    def feed_render(state):
+        engine.render_feed_cards(state['view'].iloc[:FEED_PAGE_ROWS])
+
+    def export(state):
+        view = state['view']
+        for fmt in engine.EXPORT_FORMATS:
+            for _ in engine.export_chunks(view, fmt):
+                pass
+
+    def streaks(state):
+        chrono = state['features']['chronological']
+        engine.five_star_streaks(chrono)
+        engine.rolling_streak(chrono['Rating'])
+
+    def keyword_hits(state):
+        state['hits'] = engine.keyword_hits(state['features']['index'], engine.PILLARS, engine.KEYWORDS)
+
+    def keyword_counts(state):
+        engine.count_hits(state['hits'], engine.PILLARS, state['mask'])
+        engine.count_hits(state['hits'], engine.KEYWORDS, state['mask'])
+
+    def rollup(state):
+        engine.build_rollup(state['features']['frame'], state['hits'])
+
+    def downsample(state):
+        engine.downsample_streak(state['features']['chronological'], 1000)
+
+    def report(state):
+        engine.build_report(state['features'], FILTER_DOMAINS)
+
+    return [
+        ('load_cold', load_cold), ('load_warm', load_warm), ('enrich', enrich),
+        ('near_duplicates', near_duplicates), ('near_duplicates_templated', near_duplicates_templated),
+        ('search', search),
+        ('filter_sort', filter_sort), ('feed_render', feed_render), ('export', export), ('streaks', streaks),
+        ('keyword_hits', keyword_hits), ('keyword_counts', keyword_counts), ('rollup', rollup),
+        ('downsample', downsample), ('report', report),
+    ]
+
+
+def run_size(csv_path, n_rows, repeat=3, memory=True):
+    results = []
+    state = {}
+    for name, fn in stage_plan(csv_path):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn(state)
+            timings.append(time.perf_counter() - start)
+
+        peak = None
+        if memory:
+            # Separate pass so tracemalloc overhead does not skew the timings.
+            # Only Python/NumPy allocations are traced, not Arrow's own pool.
+            tracemalloc.start()
+            fn(state)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        results.append({
+            'rows': n_rows,
+            'stage': name,
+            'seconds': min(timings),
+            'mean_seconds': float(np.mean(timings)),
+            'peak_bytes': peak,
+        })
+        print(f"{n_rows:>10,}  {name:<25} {min(timings) * 1000:>10.1f} ms"
+              + (f"  {peak / 2**20:>9.1f} MiB" if peak is not None else ""))
+    return results
+
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(r['rows'], r['stage']): r['seconds'] for r in json.load(f)['results']}
+    regressions = []
+    for r in results:
+        before = baseline.get((r['rows'], r['stage']))
+        if not before:
+            continue
+        ratio = r['seconds'] / before
+        flag = '  REGRESSION' if ratio > threshold else ''
+        print(f"{r['rows']:>10,}  {r['stage']:<25} x{ratio:.2f} vs baseline{flag}")
+        if flag:
+            regressions.append(r)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the review pipeline on synthetic corpora.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', help="where synthetic CSVs are written and reused (default: a temp dir)")
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    parser.add_argument('--output', '-o', default='bench_results.json')
+    parser.add_argument('--baseline', help="earlier results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="slowdown ratio vs baseline that counts as a regression (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='review_bench_')
+    os.makedirs(workdir, exist_ok=True)
+
+    results = []
+    for n_rows in args.sizes:
+        csv_path = os.path.join(workdir, f"synthetic_{n_rows}_{args.seed}.csv")
+        if not os.path.exists(csv_path):
+            start = time.perf_counter()
+            write_reviews(csv_path, n_rows, seed=args.seed)
+            print(f"generated {n_rows:,} rows in {time.perf_counter() - start:.1f} s -> {csv_path}")
+        results.extend(run_size(csv_path, n_rows, repeat=args.repeat, memory=not args.no_memory))
+
+    payload = {
+        'meta': {
+            'timestamp': pd.Timestamp.now(tz='UTC').isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'repeat': args.repeat,
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2)
+    print(f"wrote {len(results)} results to {args.output}")
+
+    if args.baseline:
+        return 1 if compare(results, args.baseline, args.threshold) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
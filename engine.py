@@ -0,0 +1,2513 @@
+"""Headless review analytics engine: load -> enrich -> aggregate -> report.
+
+Everything the dashboard computes lives here with no Streamlit dependency, so it
+can be imported by workers, run from nightly jobs, or profiled on its own:
+
+    python engine.py taskrabbit_reviews_clean.csv --format json
+"""
+import argparse
+import functools
+import hashlib
+import html
+import io
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+try:
+    import fcntl
+except ImportError:  # Windows: no publisher election, each process loads its own copy
+    fcntl = None
+
+
+# --- DATA LOADING ---
+DATA_FILE = 'taskrabbit_reviews_clean.csv'
+# Bump whenever STORE_SCHEMA or the derived columns change so stale stores are rebuilt
+STORE_VERSION = '3'
+
+# Typed on-disk layout of the review table (Arrow IPC, memory-mappable).
+# Date is stored as int64 days since the epoch; low-cardinality text as dictionaries.
+STORE_SCHEMA = pa.schema([
+    ('Category', pa.dictionary(pa.int32(), pa.string())),
+    ('Date', pa.int64()),
+    ('Client Name', pa.dictionary(pa.int32(), pa.string())),
+    ('Rating', pa.int8()),
+    ('Review', pa.string()),
+    ('Domain', pa.dictionary(pa.int8(), pa.string())),
+    ('Is Placeholder', pa.bool_()),
+])
+
+# Compact in-memory dtypes: star ratings fit in a nullable int8, and review text
+# lives in Arrow buffers (zero-copy from the store) instead of Python objects
+RATING_DTYPE = pd.Int8Dtype()
+REVIEW_DTYPE = pd.StringDtype('pyarrow')
+STORE_DTYPES = {pa.int8(): RATING_DTYPE, pa.string(): REVIEW_DTYPE, pa.large_string(): REVIEW_DTYPE}
+
+# Review bodies (lowercased, punctuation stripped) that mean "no written review"
+PLACEHOLDER_REVIEWS = ['nan', 'none', 'null', 'no text provided', 'no review', '']
+
+
+# Ordered substring -> domain rules; the first matching pattern wins.
+# Overridable without code changes via domain_rules.csv (columns: Pattern, Domain).
+DOMAIN_RULES_FILE = 'domain_rules.csv'
+DEFAULT_DOMAIN = 'General Ops'
+DEFAULT_DOMAIN_RULES = [
+    ('computer', 'Technical Support'),
+    ('technical', 'Technical Support'),
+    ('packing', 'Logistics'),
+    ('moving', 'Logistics'),
+    ('organization', 'Logistics'),
+    ('assistant', 'Operations'),
+    ('staffing', 'Operations'),
+    ('photo', 'Visual Media'),
+]
+
+
+def load_domain_rules(rules_path=DOMAIN_RULES_FILE):
+    if os.path.exists(rules_path):
+        rules = pd.read_csv(rules_path, dtype=str).dropna()
+        return list(zip(rules['Pattern'].str.lower(), rules['Domain']))
+    return DEFAULT_DOMAIN_RULES
+
+
+def rules_digest(rules):
+    return hashlib.sha256(repr(list(rules)).encode('utf-8')).hexdigest()
+
+
+def classify_category(category, rules):
+    cat = str(category).lower()
+    for pattern, domain in rules:
+        if pattern in cat:
+            return domain
+    return DEFAULT_DOMAIN
+
+
+def map_domains(categories, rules=None):
+    # Classify each distinct category once, then broadcast through the codes
+    rules = load_domain_rules() if rules is None else rules
+    categories = categories.astype('category')
+    domains = list(dict.fromkeys([domain for _, domain in rules] + [DEFAULT_DOMAIN]))
+    lookup = np.array(
+        [domains.index(classify_category(c, rules)) for c in categories.cat.categories]
+        # trailing slot catches code -1 (missing category), which str() used to turn into 'nan'
+        + [domains.index(classify_category(np.nan, rules))],
+        dtype=np.int8,
+    )
+    codes = lookup[categories.cat.codes.to_numpy()]
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=domains), index=categories.index
+    ).cat.remove_unused_categories()
+
+
+def normalize_review(reviews):
+    # Lowercased text without punctuation; shared by placeholder and near-duplicate detection
+    return reviews.fillna('').astype(str).str.strip().str.lower().str.replace(r'[^\w\s]', '', regex=True)
+
+
+def prepare_frame(df, rules=None):
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    df['Rating'] = pd.to_numeric(df['Rating'], errors='coerce').round().astype(RATING_DTYPE)
+    df['Domain'] = map_domains(df['Category'], rules)
+    for col in ['Category', 'Client Name']:
+        df[col] = df[col].astype('category')
+    df['Is Placeholder'] = normalize_review(df['Review']).isin(PLACEHOLDER_REVIEWS)
+    df['Review'] = df['Review'].astype(REVIEW_DTYPE)
+    return df
+
+
+def file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_store_meta(store_path):
+    try:
+        with pa.memory_map(store_path) as source:
+            meta = pa.ipc.open_file(source).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    return {k.decode(): v.decode() for k, v in meta.items()}
+
+
+def store_is_fresh(csv_path, store_path, rules):
+    meta = read_store_meta(store_path)
+    if not meta or 'source_sha256' not in meta or meta.get('store_version') != STORE_VERSION:
+        return False
+    if meta.get('domain_rules') != rules_digest(rules):
+        return False
+    stat = os.stat(csv_path)
+    if meta.get('source_mtime') == repr(stat.st_mtime) and meta.get('source_size') == str(stat.st_size):
+        return True
+    # mtime moved (copy, touch, checkout) -- only rebuild if the bytes changed too
+    if meta['source_sha256'] != file_sha256(csv_path):
+        return False
+    # Same bytes: record the new mtime so later cold starts skip the hash
+    table = read_ipc(store_path)
+    write_ipc(table.replace_schema_metadata({**meta, **source_meta(stat)}), store_path)
+    return True
+
+
+def source_meta(stat):
+    return {'source_mtime': repr(stat.st_mtime), 'source_size': str(stat.st_size)}
+
+
+def build_store(csv_path, store_path, rules):
+    df = pd.read_csv(
+        csv_path,
+        usecols=['Category', 'Date', 'Client Name', 'Rating', 'Review'],
+        dtype={'Category': 'category', 'Client Name': 'category', 'Review': 'object'},
+    )
+    df = prepare_frame(df, rules)
+
+    days = df['Date'].to_numpy(dtype='datetime64[D]')
+    date_days = pd.array(days.astype('int64'), dtype='Int64')
+    date_days[np.isnat(days)] = pd.NA
+
+    table = pa.Table.from_pandas(
+        df.assign(Date=date_days)[STORE_SCHEMA.names], schema=STORE_SCHEMA, preserve_index=False
+    )
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        **source_meta(os.stat(csv_path)),
+        'source_sha256': file_sha256(csv_path),
+        'domain_rules': rules_digest(rules),
+        'store_version': STORE_VERSION,
+    })
+
+    # Read-only deploys still work, they just pay the CSV parse on every cold start
+    write_ipc(table, store_path)
+    return df
+
+
+def remove_file(path):
+    # Another process may have removed it first; either way it is gone
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def write_ipc(table, path):
+    # Atomic Arrow IPC write: readers see the old file or the new one, never a partial
+    # one. The temp name is per process and thread, so concurrent writers never share it.
+    tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+        return True
+    except OSError:
+        remove_file(tmp_path)
+        return False
+
+
+def read_ipc(path):
+    # Memory-mapped and zero-copy; the mapping stays open while Arrow buffers reference it
+    return pa.ipc.open_file(pa.memory_map(path)).read_all()
+
+
+def read_store(store_path):
+    table = read_ipc(store_path)
+    df = table.to_pandas(split_blocks=True, self_destruct=True, types_mapper=STORE_DTYPES.get)
+    del table
+    df['Date'] = pd.to_datetime(df['Date'].astype('float64'), unit='D')
+    return df
+
+
+def store_path_for(csv_path):
+    return os.path.splitext(csv_path)[0] + '.arrow'
+
+
+STORE_FILE = store_path_for(DATA_FILE)
+
+
+def source_mtime(file_path):
+    return os.path.getmtime(file_path) if os.path.exists(file_path) else None
+
+
+def load_data(file_path=DATA_FILE, rules=None):
+    rules = load_domain_rules() if rules is None else rules
+    store_path = store_path_for(file_path)
+
+    if os.path.exists(file_path):
+        if store_is_fresh(file_path, store_path, rules):
+            df = read_store(store_path)
+        else:
+            df = build_store(file_path, store_path, rules)
+    else:
+        data = {
+            'Category': [
+                'Arts / Crafts', 'Errands', 'Arts / Crafts', 'Arts / Crafts', 'Computer Help',
+                'Errands', 'Event Staffing', 'Arts / Crafts', 'Packing & Unpacking', 'Computer Help',
+                'Event Staffing', 'Event Staffing', 'Photography', 'Computer Help', 'Packing & Unpacking',
+            ],
+            'Date': [
+                '2025-12-23', '2025-12-21', '2025-12-21', '2025-12-20', '2025-12-19',
+                '2025-12-14', '2025-12-12', '2025-12-09', '2025-12-06', '2025-12-06',
+                '2025-12-02', '2025-11-23', '2025-11-16', '2025-11-14', '2025-10-29',
+            ],
+            'Client Name': [
+                'Pat B.', 'Kara Keating B.', 'Holly H.', 'Jeffrey G.', 'Miriam O.',
+                'Carine C.', 'Shanti F.', 'Carl D.', 'Chris V.', 'Kathy D.',
+                'Paula O.', 'Benjamin M.', 'Todd H.', 'Scott S.', 'Eri S.',
+            ],
+            'Rating': [5.0, 5.0, 5.0, 5.0, 5.0, 5.0, 5.0, 5.0, 5.0, 5.0, 5.0, 5.0, 5.0, 5.0, 5.0],
+            'Review': [
+                "Lauren is very professional and does a great job. I highly recommend!",
+                "Saved the day with a prompt gift wrapping job. Followed all instructions!",
+                "Lauren is lovely to work with. Excellent communication and great attention to detail.",
+                "Lauren was great. Great communication went over and out of her way to help when needed. Can't recommend her enough.",
+                "Lauren was great at communication... relaxed yet very efficient, and got the job done.",
+                "Lauren is a pleasure to work with. She was also very responsive throughout our communication.",
+                "Lauren has now done three events at our house. She is terrific and such a pleasure to work with.",
+                "Lauren is extremely talented and professional. She completed the entire task with great care.",
+                "Very easy and friendly. Highly recommended.",
+                "She is really good!",
+                "She did an absolutely fantastic job decorating my trees! She worked quickly and efficiently.",
+                "Lauren was excellent. Super communicative, friendly, and great to work with.",
+                "No text provided",
+                "Lauren is smart, pleasant and tenacious. Great combo! Hire her!! Very pleased.",
+                "Lauren went above and beyond. Much appreciated.",
+            ]
+        }
+        df = prepare_frame(pd.DataFrame(data), rules)
+    return df
+
+
+# --- SEARCH INDEX ---
+TOKEN_RE = re.compile(r'\w+')
+# "quoted phrase" | bare term (prefix match, optional trailing *)
+QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+
+class ReviewIndex:
+    # Inverted index over the Review column in CSR form: for vocab[i] (sorted),
+    # rows[offsets[i]:offsets[i + 1]] are the matching row positions and tf the
+    # per-row term counts. Lookups are binary searches over the vocabulary.
+
+    def __init__(self, reviews, row_offset=0):
+        start = time.perf_counter()
+        self.reviews = reviews.reset_index(drop=True)
+        self.row_offset = row_offset
+        tokens = self.reviews.fillna('').astype(object).str.lower().str.findall(TOKEN_RE).explode().dropna()
+        rows = tokens.index.to_numpy(dtype=np.int64) + row_offset
+        codes, vocab = pd.factorize(tokens.to_numpy(dtype=object), sort=True)
+
+        order = np.lexsort((rows, codes))
+        codes, rows = codes[order], rows[order]
+        # collapse repeated (term, row) pairs into a single posting with a count
+        first = np.ones(len(rows), dtype=bool)
+        first[1:] = (codes[1:] != codes[:-1]) | (rows[1:] != rows[:-1])
+        starts = np.flatnonzero(first)
+
+        self.vocab = np.asarray(vocab, dtype=object)
+        self.rows = rows[starts]
+        self.tf = np.diff(np.append(starts, len(rows))).astype(np.int32)
+        self.offsets = np.searchsorted(codes[starts], np.arange(len(self.vocab) + 1))
+        self.n_terms = len(self.vocab)
+        self.build_seconds = time.perf_counter() - start
+
+    @classmethod
+    def from_postings(cls, reviews, vocab, rows, tf, offsets, row_offset=0):
+        # Wrap existing CSR arrays (e.g. memory-mapped ones) without re-tokenizing
+        index = cls.__new__(cls)
+        index.reviews = reviews.reset_index(drop=True)
+        index.row_offset = row_offset
+        index.vocab, index.rows, index.tf, index.offsets = vocab, rows, tf, offsets
+        index.n_terms = len(vocab)
+        index.build_seconds = 0.0
+        return index
+
+    def postings(self, term, prefix=False):
+        lo = np.searchsorted(self.vocab, term, side='left')
+        if prefix:
+            hi = np.searchsorted(self.vocab, term + '\U0010ffff', side='left')
+        else:
+            hi = lo + int(lo < len(self.vocab) and self.vocab[lo] == term)
+        rows = self.rows[self.offsets[lo]:self.offsets[hi]]
+        tf = self.tf[self.offsets[lo]:self.offsets[hi]]
+        if hi - lo > 1:
+            # several vocabulary entries share the prefix -- merge their postings
+            rows, inverse = np.unique(rows, return_inverse=True)
+            tf = np.bincount(inverse, weights=tf).astype(np.int32)
+        return rows, tf
+
+    def phrase_postings(self, tokens):
+        rows, _ = self.postings(tokens[0])
+        for token in tokens[1:]:
+            rows = np.intersect1d(rows, self.postings(token)[0], assume_unique=True)
+        # only the candidate rows are scanned, and the pattern is built from escaped tokens
+        pattern = r'\b' + r'\W+'.join(re.escape(t) for t in tokens) + r'\b'
+        counts = self.reviews.iloc[rows - self.row_offset].fillna('').astype(object) \
+            .str.count(pattern, flags=re.IGNORECASE).to_numpy()
+        return rows[counts > 0], counts[counts > 0].astype(np.int32)
+
+    def search(self, query, rank=False):
+        rows, score = None, None
+        for phrase, word in QUERY_RE.findall(query.lower()):
+            tokens = TOKEN_RE.findall(phrase or word)
+            if not tokens:
+                continue
+            if phrase or len(tokens) > 1:
+                c_rows, c_tf = self.phrase_postings(tokens)
+            else:
+                c_rows, c_tf = self.postings(tokens[0], prefix=True)
+            if rows is None:
+                rows, score = c_rows, c_tf
+            else:
+                rows, ia, ib = np.intersect1d(rows, c_rows, assume_unique=True, return_indices=True)
+                score = score[ia] + c_tf[ib]
+
+        if rows is None:
+            return np.array([], dtype=np.int64)
+        if rank:
+            return rows[np.lexsort((rows, -score))]
+        return rows
+
+
+class SegmentedIndex:
+    # Append-only set of ReviewIndex segments covering consecutive row ranges, so a
+    # new batch is indexed on its own instead of re-tokenizing the whole corpus.
+    # A new segment is merged into the one before it, from their postings, while that
+    # one is at most twice its size; this keeps O(log n) segments, like a binary counter.
+
+    def __init__(self, segments, terms=None):
+        self.segments = segments
+        # Set of all terms, kept only once segments are added, so n_terms is a running count
+        self.terms = terms
+        self.build_seconds = sum(seg.build_seconds for seg in segments)
+        self.n_terms = len(terms) if terms is not None else segments[0].n_terms
+
+    def with_segment(self, segment, all_reviews):
+        terms = set().union(*(seg.vocab for seg in self.segments)) if self.terms is None else self.terms
+        terms.update(segment.vocab)
+        segments = self.segments + [segment]
+        while len(segments) > 1 and len(segments[-2].rows) <= 2 * len(segments[-1].rows):
+            segments[-2:] = [merge_segments(segments[-2:], all_reviews)]
+        return SegmentedIndex(segments, terms)
+
+    def merged(self, all_reviews):
+        # One ReviewIndex over every segment
+        return merge_segments(self.segments, all_reviews)
+
+    def postings(self, term, prefix=False):
+        parts = [seg.postings(term, prefix) for seg in self.segments]
+        return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+    def phrase_postings(self, tokens):
+        parts = [seg.phrase_postings(tokens) for seg in self.segments]
+        return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+    # Query parsing only needs postings()/phrase_postings(), which both classes provide
+    search = ReviewIndex.search
+
+
+def merge_segments(segments, all_reviews):
+    # One ReviewIndex over consecutive segments, assembled from their postings
+    vocab = np.unique(np.concatenate([seg.vocab for seg in segments]))
+    codes = np.concatenate([
+        np.repeat(np.searchsorted(vocab, seg.vocab), np.diff(seg.offsets)) for seg in segments
+    ])
+    rows = np.concatenate([seg.rows for seg in segments])
+    tf = np.concatenate([seg.tf for seg in segments])
+    order = np.lexsort((rows, codes))
+    offsets = np.searchsorted(codes[order], np.arange(len(vocab) + 1))
+    start = segments[0].row_offset
+    reviews = all_reviews.iloc[start:start + sum(len(seg.reviews) for seg in segments)]
+    index = ReviewIndex.from_postings(reviews, vocab, rows[order], tf[order], offsets, row_offset=start)
+    index.build_seconds = sum(seg.build_seconds for seg in segments)
+    return index
+
+
+# --- KEYWORD ENGINE ---
+# Trait vocabulary for the Analytics tab. A term is a whole word unless it ends in
+# '*' (stem / prefix match); multi-word terms such as "stress-free" match as phrases.
+PILLARS = {
+    "Execution Velocity": ['fast*', 'quick*', 'speed*', 'efficien*'],
+    "Composure (Calm/Easy)": ['calm*', 'easy', 'patient*', 'stress-free'],
+    "Communication Clarity": ['communicat*', 'talk*', 'conversation*'],
+    "Interpersonal IQ": ['nice', 'friendly', 'kind'],
+    "High-Stakes Quality": ['recommend*', 'perfect*', 'fantastic', 'wonderful*'],
+}
+KEYWORDS = {
+    "Great": ['great*'],
+    "Recommend": ['recommend*'],
+    "Helpful": ['helpful'],
+    "Professional": ['professional*'],
+    "Efficient": ['efficient*'],
+    "Communication": ['communicat*'],
+    "Quick/Fast": ['quick*', 'fast*'],
+    "Easy": ['easy'],
+    "Excellent": ['excellent'],
+    "Friendly": ['friendly'],
+    "Amazing": ['amazing*'],
+    "Wonderful": ['wonderful*'],
+}
+
+
+def term_postings(index, term):
+    tokens = TOKEN_RE.findall(term.lower())
+    if len(tokens) > 1:
+        return index.phrase_postings(tokens)
+    return index.postings(tokens[0], prefix=term.endswith('*'))
+
+
+def keyword_hits(index, *groups):
+    # Sparse per-review hit matrix in COO form: one (Row, Term, Count) entry per
+    # review that mentions a term. Every term is resolved once from the postings.
+    terms = list(dict.fromkeys(t for group in groups for ts in group.values() for t in ts))
+    frames = []
+    for term in terms:
+        rows, tf = term_postings(index, term)
+        frames.append(pd.DataFrame({'Row': rows, 'Term': term, 'Count': tf}))
+    hits = pd.concat(frames, ignore_index=True)
+    hits['Term'] = hits['Term'].astype(pd.CategoricalDtype(terms))
+    return hits
+
+
+def count_hits(hits, group, row_mask=None, weights=None):
+    # Mentions per label in `group`, optionally restricted to the rows in row_mask.
+    # Per-row weights (e.g. 1 / near-duplicate cluster size) scale each review's mentions.
+    if row_mask is not None:
+        hits = hits[np.asarray(row_mask)[hits['Row'].to_numpy()]]
+    counts = hits['Count']
+    if weights is not None:
+        counts = counts * np.asarray(weights)[hits['Row'].to_numpy()]
+    per_term = counts.groupby(hits['Term'], observed=False).sum()
+    return pd.Series({label: int(round(per_term[terms].sum())) for label, terms in group.items()})
+
+
+# --- STREAK ANALYTICS ---
+def five_star_runs(ratings):
+    # Run-length encode the 5-star flag: half-open [start, end) positions of every run
+    is_five = np.asarray(ratings, dtype=np.float64) == 5.0
+    edges = np.diff(np.concatenate(([0], is_five.view(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def five_star_streaks(chrono_df):
+    # Every unbroken 5-star streak in a chronologically ordered frame
+    ratings = chrono_df['Rating'].to_numpy(dtype=np.float64)
+    dates = chrono_df['Date'].to_numpy()
+    ordinals = chrono_df['Review #'].to_numpy()
+    starts, ends = five_star_runs(ratings)
+    # The review right after a run broke it; the last run may still be open
+    broken = ends < len(ratings)
+    broken_by = np.full(len(ends), np.nan)
+    broken_by[broken] = ratings[ends[broken]]
+    return pd.DataFrame({
+        'Start': dates[starts],
+        'End': dates[ends - 1],
+        'Start #': ordinals[starts],
+        'End #': ordinals[ends - 1],
+        'Length': ends - starts,
+        'Broken By': broken_by,
+    })
+
+
+def rolling_streak(ratings):
+    # Length of the 5-star run ending at each position (0 on a non-5-star review)
+    is_five = np.asarray(ratings, dtype=np.float64) == 5.0
+    positions = np.arange(len(is_five))
+    last_break = np.maximum.accumulate(np.where(is_five, -1, positions))
+    return np.where(is_five, positions - last_break, 0)
+
+
+def streak_distribution(streaks):
+    return streaks['Length'].value_counts().sort_index().rename_axis('Length').reset_index(name='Streaks')
+
+
+# --- CHART DOWNSAMPLING ---
+STREAK_POINT_BUDGETS = [500, 1000, 2000, 5000]
+STREAK_CHART_COLUMNS = ['Review #', 'Rating', 'Rating Group', 'Client Name', 'Date', 'Category']
+
+
+def downsample_streak(chrono_df, budget):
+    # Min/max bucketing for the streak timeline. Every non-5-star review stays an
+    # exact bar; consecutive 5-star reviews inside a bucket collapse into one ranged
+    # bar spanning their first..last ordinal. Returns (exact bars, 5-star buckets).
+    points = chrono_df[STREAK_CHART_COLUMNS]
+    if len(points) <= budget:
+        return points, pd.DataFrame(columns=['Review #', 'Review # End', 'Reviews', 'From', 'To', 'Rating', 'Rating Group'])
+
+    is_five = points['Rating'].to_numpy(dtype=np.float64) == 5.0
+    n_exact = int((~is_five).sum())
+    # a bucket can be split by each exact bar, so reserve room for those splits too
+    n_buckets = max(budget - 2 * n_exact, 1)
+    bucket = np.arange(len(points)) * n_buckets // len(points)
+    run = np.cumsum(~is_five)
+
+    five = points[is_five]
+    grouped = five.groupby([bucket[is_five], run[is_five]], sort=False)
+    buckets = pd.DataFrame({
+        'Review #': grouped['Review #'].min() - 0.5,
+        'Review # End': grouped['Review #'].max() + 0.5,
+        'Reviews': grouped.size(),
+        'From': grouped['Date'].min(),
+        'To': grouped['Date'].max(),
+    }).reset_index(drop=True)
+    buckets['Rating'] = 5.0
+    buckets['Rating Group'] = RATING_GROUPS[0]
+    return points[~is_five], buckets
+
+
+# --- ROLLUP CUBE ---
+# Additive aggregates per (Grain, Period, Domain, Category). Storing sums rather
+# than means lets new batches be merged in with a plain groupby-sum.
+ROLLUP_GRAINS = {'day': 'D', 'week': 'W', 'month': 'M', 'year': 'Y'}
+ROLLUP_GRAIN_DAYS = {'day': 1, 'week': 7, 'month': 30.44, 'year': 365.25}
+ROLLUP_KEYS = ['Grain', 'Period', 'Domain', 'Category']
+# Whole-history totals (dated or not) per Domain / Category, for the headline metrics
+TOTAL_GRAIN = 'all'
+MAX_TREND_POINTS = 400
+# Rated reviews below this many stars count against reliability
+RISK_BELOW = 4.0
+
+
+def hit_matrix(hits, group, n_rows, row_offset=0):
+    # Per-review mention counts for each label in `group` (rows x labels)
+    out = np.zeros((n_rows, len(group)), dtype=np.int32)
+    rows = hits['Row'].to_numpy() - row_offset
+    counts = hits['Count'].to_numpy()
+    for j, terms in enumerate(group.values()):
+        sel = hits['Term'].isin(terms).to_numpy()
+        np.add.at(out[:, j], rows[sel], counts[sel])
+    return pd.DataFrame(out, columns=list(group))
+
+
+def build_rollup(frame, hits, row_offset=0):
+    # `frame` holds rows [row_offset, row_offset + len(frame)) of the dataset
+    rating = frame['Rating'].to_numpy(dtype=np.float64)
+    in_batch = (hits['Row'] >= row_offset) & (hits['Row'] < row_offset + len(frame))
+    base = pd.DataFrame({
+        'Domain': frame['Domain'].astype(str).to_numpy(),
+        'Category': frame['Category'].astype(str).to_numpy(),
+        'Reviews': 1,
+        'Rated': ~np.isnan(rating),
+        'Rating Sum': np.nan_to_num(rating),
+        'Five Star': rating == 5.0,
+        'At Risk': rating < RISK_BELOW,
+    }).join(hit_matrix(hits[in_batch], PILLARS, len(frame), row_offset))
+
+    cubes = [
+        base.assign(Grain=TOTAL_GRAIN, Period=pd.NaT)
+        .groupby(ROLLUP_KEYS, sort=False, dropna=False).sum().reset_index()
+    ]
+    dated = frame['Date'].notna().to_numpy()
+    base, dates = base[dated], frame['Date'][dated]
+    for grain, freq in ROLLUP_GRAINS.items():
+        period = dates.dt.to_period(freq).dt.start_time.to_numpy()
+        cubes.append(
+            base.assign(Grain=grain, Period=period)
+            .groupby(ROLLUP_KEYS, sort=False).sum().reset_index()
+        )
+    return pd.concat(cubes, ignore_index=True)
+
+
+def merge_rollup(cube, batch_cube, keys=ROLLUP_KEYS):
+    merged = pd.concat([cube, batch_cube], ignore_index=True)
+    return merged.groupby(keys, sort=False, dropna=False).sum().reset_index()
+
+
+def choose_grain(start, end):
+    # Finest grain that keeps the chart within MAX_TREND_POINTS periods
+    days = (pd.Timestamp(end) - pd.Timestamp(start)).days + 1
+    for grain, grain_days in ROLLUP_GRAIN_DAYS.items():
+        if days / grain_days <= MAX_TREND_POINTS:
+            return grain
+    return 'year'
+
+
+def select_cells(cube, domains=None, categories=None):
+    # Cube rows for a Domain / Category selection; None means "all"
+    sel = np.ones(len(cube), dtype=bool)
+    if domains is not None:
+        sel &= cube['Domain'].isin(domains).to_numpy()
+    if categories is not None:
+        sel &= cube['Category'].isin(categories).to_numpy()
+    return cube[sel]
+
+
+def select_rollup(cube, grain, domains=None, categories=None):
+    # Cube rows of one grain for a Domain / Category selection
+    return select_cells(cube[cube['Grain'] == grain], domains, categories)
+
+
+def query_rollup(cube, grain, domains, categories, start, end):
+    start = pd.Timestamp(start).to_period(ROLLUP_GRAINS[grain]).start_time
+    sel = select_rollup(cube, grain, domains, categories)
+    sel = sel[sel['Period'].between(start, pd.Timestamp(end))]
+    agg = sel.groupby('Period').sum(numeric_only=True)
+    trend = pd.DataFrame({
+        'Reviews': agg['Reviews'],
+        'Mean Rating': agg['Rating Sum'] / agg['Rated'],
+        '5-Star Share': agg['Five Star'] / agg['Rated'],
+        'Risk Rate': agg['At Risk'] / agg['Rated'],
+        **{f"{pillar} Rate": agg[pillar] / agg['Reviews'] for pillar in PILLARS},
+    })
+    return trend.reset_index()
+
+
+# --- RELIABILITY METRICS ---
+# Headline and SLA figures read from the rollup cube, so they follow any filter and
+# stay current as batches are merged in, without touching the review rows.
+CONFIDENCE_Z = 1.96
+# An SLA window is met when the lower 95% bound of its on-target share clears this
+SLA_TARGET = 0.90
+SLA_WINDOW_MONTHS = 12
+
+
+def wilson_interval(successes, trials, z=CONFIDENCE_Z):
+    # Wilson score interval for a binomial share; NaN where there are no trials
+    successes = np.asarray(successes, dtype=np.float64)
+    trials = np.asarray(trials, dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p = successes / trials
+        denom = 1 + z**2 / trials
+        center = (p + z**2 / (2 * trials)) / denom
+        half = z * np.sqrt(p * (1 - p) / trials + z**2 / (4 * trials**2)) / denom
+    return center - half, center + half
+
+
+def headline_metrics(cube, domains=None, categories=None):
+    totals = select_rollup(cube, TOTAL_GRAIN, domains, categories)[['Reviews', 'Rated', 'Rating Sum', 'Five Star', 'At Risk']].sum()
+    reviews, rated, five_star, at_risk = (int(totals[c]) for c in ['Reviews', 'Rated', 'Five Star', 'At Risk'])
+    low, high = wilson_interval(at_risk, rated)
+    return {
+        'reviews': reviews,
+        'rated': rated,
+        'composite_rating': round(float(totals['Rating Sum']) / rated, 2) if rated else None,
+        'five_star': five_star,
+        'five_star_share': round(five_star / rated, 4) if rated else None,
+        'at_risk': at_risk,
+        'risk_rate': round(at_risk / rated, 4) if rated else None,
+        'risk_low': round(float(low), 4) if rated else None,
+        'risk_high': round(float(high), 4) if rated else None,
+    }
+
+
+def rolling_sla(cube, by='Domain', domains=None, categories=None, window=SLA_WINDOW_MONTHS, target=SLA_TARGET):
+    # Trailing `window`-month reliability per group, from the monthly cube
+    columns = ['Group', 'Period', 'Rated', 'At Risk', 'Reliability', 'SLA Score', 'Meets SLA']
+    month = select_rollup(cube, 'month', domains, categories)
+    if month.empty:
+        return pd.DataFrame(columns=columns)
+    periods = pd.date_range(month['Period'].min(), month['Period'].max(), freq='MS', name='Period')
+    rolled = {
+        col: month.pivot_table(index='Period', columns=by, values=col, aggfunc='sum', fill_value=0, observed=True)
+        .reindex(periods, fill_value=0).rolling(window, min_periods=1).sum().stack()
+        for col in ['Rated', 'At Risk']
+    }
+    sla = pd.DataFrame(rolled).reset_index().set_axis(['Period', 'Group', 'Rated', 'At Risk'], axis=1)
+    sla = sla[sla['Rated'] > 0].astype({'Rated': 'int64', 'At Risk': 'int64'})
+    sla['Reliability'] = 1 - sla['At Risk'] / sla['Rated']
+    sla['SLA Score'] = 1 - wilson_interval(sla['At Risk'], sla['Rated'])[1]
+    sla['Meets SLA'] = sla['SLA Score'] >= target
+    return sla[columns].reset_index(drop=True)
+
+
+def sla_summary(sla):
+    # Each group's most recent trailing window
+    return sla[sla['Period'] == sla['Period'].max()].drop(columns='Period').reset_index(drop=True)
+
+
+# --- REVIEW SCORING ---
+# Pluggable per-review scorers. A scorer maps a list of review texts to a dict of
+# equal-length arrays, one per output column. Results are cached on disk keyed by
+# a hash of the text, so each distinct review is scored once per scorer version.
+SCORE_CACHE_DIR = '.'
+# Part files a long-running process may leave before it compacts them into the base file
+SCORE_CACHE_MAX_PARTS = 16
+SCORE_BATCH_ROWS = 5_000
+# Below this many unscored texts a process pool costs more to start than it saves
+SCORE_POOL_MIN_ROWS = 20_000
+
+POSITIVE_WORDS = {
+    'amazing', 'appreciate', 'appreciated', 'awesome', 'beautiful', 'best', 'calm', 'easy', 'efficient',
+    'excellent', 'fantastic', 'fast', 'friendly', 'glad', 'good', 'great', 'happy', 'helpful', 'impressed',
+    'incredible', 'kind', 'lifesaver', 'love', 'loved', 'nice', 'outstanding', 'patient', 'perfect',
+    'pleasant', 'pleasure', 'pleased', 'professional', 'quick', 'recommend', 'recommended', 'reliable',
+    'smart', 'superb', 'thank', 'thanks', 'thorough', 'wonderful',
+}
+NEGATIVE_WORDS = {
+    'annoyed', 'awful', 'bad', 'broke', 'broken', 'careless', 'damaged', 'difficult', 'disappointed',
+    'disappointing', 'frustrating', 'issue', 'issues', 'late', 'mess', 'messy', 'mistake', 'poor',
+    'problem', 'problems', 'rude', 'slow', 'terrible', 'unhappy', 'unprofessional', 'unreliable',
+    'worse', 'worst', 'wrong',
+}
+# `t` covers the tail of "can't", "didn't", ... after tokenizing
+NEGATORS = {'not', 'no', 'never', 'nothing', 'without', 'hardly', 't'}
+NEGATION_WINDOW = 3
+# Negated word -> the word that turns the negation into praise ("can't recommend her enough")
+NEGATION_IDIOMS = {'recommend': 'enough'}
+
+
+def content_digest(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+
+class LexiconSentiment:
+    # Word-list polarity with simple negation ("not great", "didn't like"), squashed
+    # to [-1, 1]. "Can't recommend her enough" is an idiom, not a negation.
+    name = 'sentiment'
+    columns = {'Sentiment': pa.float32()}
+    version = content_digest(
+        sorted(POSITIVE_WORDS), sorted(NEGATIVE_WORDS), sorted(NEGATORS), NEGATION_WINDOW, NEGATION_IDIOMS
+    )
+
+    def score(self, texts):
+        out = np.empty(len(texts), dtype=np.float32)
+        for i, text in enumerate(texts):
+            tokens = TOKEN_RE.findall(text.lower())
+            raw = 0
+            for j, token in enumerate(tokens):
+                polarity = (token in POSITIVE_WORDS) - (token in NEGATIVE_WORDS)
+                if not polarity:
+                    continue
+                negated = not NEGATORS.isdisjoint(tokens[max(j - NEGATION_WINDOW, 0):j])
+                idiom = NEGATION_IDIOMS.get(token)
+                if negated and not (idiom and idiom in tokens[j + 1:j + 1 + NEGATION_WINDOW]):
+                    polarity = -polarity
+                raw += polarity
+            out[i] = raw / np.sqrt(raw * raw + 4)
+        return {'Sentiment': out}
+
+
+class PillarClassifier:
+    # Assigns each review the pillar it mentions most, using the same term rules as
+    # the keyword engine (whole word, 'stem*', or multi-word phrase)
+    name = 'pillar'
+    columns = {'Top Pillar': pa.string(), 'Pillar Mentions': pa.int32()}
+    version = content_digest(PILLARS)
+
+    def __init__(self):
+        self.patterns = {label: pillar_pattern(terms) for label, terms in PILLARS.items()}
+
+    def score(self, texts):
+        top = np.empty(len(texts), dtype=object)
+        mentions = np.zeros(len(texts), dtype=np.int32)
+        for i, text in enumerate(texts):
+            text = text.lower()
+            counts = {label: len(pattern.findall(text)) for label, pattern in self.patterns.items()}
+            best = max(counts, key=counts.get)
+            top[i] = best if counts[best] else None
+            mentions[i] = sum(counts.values())
+        return {'Top Pillar': top, 'Pillar Mentions': mentions}
+
+
+def pillar_pattern(terms):
+    # One regex per pillar; a phrase allows any separator between its words, like the tokenizer
+    alternatives = []
+    for term in terms:
+        words = TOKEN_RE.findall(term.lower())
+        body = r'\W+'.join(map(re.escape, words))
+        alternatives.append(rf'\b{body}\w*' if term.endswith('*') else rf'\b{body}\b')
+    return re.compile('|'.join(alternatives))
+
+
+SCORERS = [LexiconSentiment(), PillarClassifier()]
+# Arrow -> pandas dtypes for scorer columns, so integer scores keep their missing values
+SCORE_DTYPES = {pa.int32(): pd.Int32Dtype()}
+
+
+def text_keys(texts):
+    return pd.util.hash_pandas_object(pd.Series(texts, dtype=object), index=False).to_numpy()
+
+
+class ScoreCache:
+    # Sorted content keys plus one array per scorer column, held as a few sorted
+    # segments. New scores are appended as a segment, merged into the one before it
+    # once they reach half its size, and persisted as their own small part file, so a
+    # batch costs its own size rather than the history's. Opening the cache, or more
+    # than SCORE_CACHE_MAX_PARTS part files, compacts the parts into the base file.
+    # Files written by another scorer version are ignored.
+
+    def __init__(self, scorer, cache_dir=SCORE_CACHE_DIR):
+        self.scorer = scorer
+        self.path = os.path.join(cache_dir, f"review_scores_{scorer.name}.arrow") if cache_dir else None
+        self.segments = []
+        if self.path:
+            self.load()
+
+    def part_paths(self):
+        directory = os.path.dirname(self.path) or '.'
+        prefix = f"review_scores_{self.scorer.name}.part-"
+        return sorted(
+            os.path.join(directory, e) for e in os.listdir(directory) if e.startswith(prefix) and e.endswith('.arrow')
+        )
+
+    def read(self, path):
+        try:
+            table = pa.ipc.open_file(path).read_all()
+        except (OSError, pa.ArrowInvalid):
+            return None
+        meta = table.schema.metadata or {}
+        if meta.get(b'scorer_version', b'').decode() != self.scorer.version:
+            return None
+        values = {col: table.column(col).to_numpy(zero_copy_only=False) for col in self.scorer.columns}
+        return table.column('Key').to_numpy(), values
+
+    def write(self, path, segment):
+        keys, values = segment
+        arrays = [pa.array(keys, pa.uint64())]
+        arrays += [pa.array(values[col], typ, from_pandas=True) for col, typ in self.scorer.columns.items()]
+        schema = pa.schema([('Key', pa.uint64())] + list(self.scorer.columns.items()),
+                           metadata={'scorer': self.scorer.name, 'scorer_version': self.scorer.version})
+        # Read-only deploys keep the scores in memory only
+        return write_ipc(pa.Table.from_arrays(arrays, schema=schema), path)
+
+    def load(self):
+        parts = self.part_paths()
+        self.segments = [seg for seg in map(self.read, [self.path] + parts) if seg is not None]
+        if len(self.segments) > 1:
+            self.segments = [self.merge(self.segments)]
+        if parts:
+            self.compact()
+
+    def compact(self):
+        # Fold the part files into the base file, one process at a time: the others
+        # skip it. Parts are re-listed under the lock, since another process may have
+        # folded and removed some already.
+        try:
+            lock = open(f"{self.path}.lock", 'a')
+        except OSError:
+            return
+        try:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return
+            parts = self.part_paths()
+            segments = [seg for seg in map(self.read, [self.path] + parts) if seg is not None]
+            if not segments or self.write(self.path, self.merge(segments)):
+                for path in parts:
+                    remove_file(path)
+        finally:
+            lock.close()
+
+    def merge(self, segments):
+        keys, first = np.unique(np.concatenate([keys for keys, _ in segments]), return_index=True)
+        values = {
+            col: np.concatenate([np.asarray(seg_values[col], dtype=object) for _, seg_values in segments])[first]
+            for col in self.scorer.columns
+        }
+        return keys, values
+
+    def lookup(self, keys):
+        # -> (found mask, {column: cached values aligned to keys})
+        found = np.zeros(len(keys), dtype=bool)
+        values = {col: np.full(len(keys), None, dtype=object) for col in self.scorer.columns}
+        for seg_keys, seg_values in self.segments:
+            if not len(seg_keys):
+                continue
+            pos = np.minimum(np.searchsorted(seg_keys, keys), len(seg_keys) - 1)
+            hit = (seg_keys[pos] == keys) & ~found
+            for col in values:
+                values[col][hit] = seg_values[col][pos[hit]]
+            found |= hit
+        return found, values
+
+    def add(self, keys, values):
+        order = np.argsort(keys, kind='stable')
+        segment = (keys[order], {col: np.asarray(values[col])[order] for col in self.scorer.columns})
+        if self.path:
+            if os.path.exists(self.path):
+                digest = hashlib.sha256(segment[0].tobytes()).hexdigest()[:16]
+                name = f"review_scores_{self.scorer.name}.part-{digest}.arrow"
+                self.write(os.path.join(os.path.dirname(self.path), name), segment)
+                if len(self.part_paths()) > SCORE_CACHE_MAX_PARTS:
+                    self.compact()
+            else:
+                self.write(self.path, segment)
+        self.segments.append(segment)
+        while len(self.segments) > 1 and 2 * len(self.segments[-1][0]) >= len(self.segments[-2][0]):
+            self.segments[-2:] = [self.merge(self.segments[-2:])]
+
+
+def open_score_caches(cache_dir=SCORE_CACHE_DIR, scorers=SCORERS):
+    return [ScoreCache(scorer, cache_dir) for scorer in scorers]
+
+
+def _score_batch(scorer, texts):
+    return scorer.score(texts)
+
+
+def run_scorer(scorer, texts, workers=None):
+    # Batches go to a process pool only when there are enough of them to pay for it.
+    # 'spawn' keeps the workers free of the parent's threads (e.g. a Streamlit server).
+    batches = [texts[i:i + SCORE_BATCH_ROWS] for i in range(0, len(texts), SCORE_BATCH_ROWS)]
+    workers = workers or os.cpu_count() or 1
+    if len(texts) < SCORE_POOL_MIN_ROWS or workers == 1:
+        results = [_score_batch(scorer, batch) for batch in batches]
+    else:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            results = list(pool.map(_score_batch, [scorer] * len(batches), batches))
+    return {col: np.concatenate([r[col] for r in results]) if results else np.empty(0) for col in scorer.columns}
+
+
+def score_reviews(texts, caches=None, workers=None):
+    # Scores aligned to `texts`; missing texts (NaN) get missing scores. Each
+    # distinct text is looked up once and only cache misses are scored.
+    caches = open_score_caches() if caches is None else caches
+    codes, uniques = pd.factorize(pd.Series(texts, dtype=object))
+    uniques = np.asarray(uniques, dtype=object)
+    keys = text_keys(uniques)
+    out = {}
+    for cache in caches:
+        scorer = cache.scorer
+        found, cached = cache.lookup(keys)
+        if not found.all():
+            missing = np.flatnonzero(~found)
+            scored = run_scorer(scorer, uniques[missing].tolist(), workers)
+            cache.add(keys[missing], scored)
+            for col in scorer.columns:
+                cached[col][missing] = scored[col]
+        for col, typ in scorer.columns.items():
+            values = np.full(len(codes), None, dtype=object)
+            values[codes >= 0] = cached[col][codes[codes >= 0]]
+            values = pa.array(values, typ, from_pandas=True)
+            if typ == pa.string():
+                # Labels repeat heavily, so they are kept dictionary-encoded (categorical)
+                values = values.dictionary_encode()
+            out[col] = values.to_pandas(types_mapper=SCORE_DTYPES.get)
+    return pd.DataFrame(out, index=range(len(codes)))
+
+
+SENTIMENT_BINS = np.round(np.linspace(-1, 1, 11), 1)
+
+
+# Both score charts read additive per-(Domain, Category) cubes built with the
+# features, so a filter change sums a few hundred cells instead of regrouping rows
+SENTIMENT_KEYS = ['Domain', 'Category', 'Sentiment']
+PILLAR_MIX_KEYS = ['Domain', 'Category', 'Top Pillar']
+
+
+def build_score_rollups(frame, bins=SENTIMENT_BINS):
+    # -> (reviews and sentiment sum per sentiment bin, reviews per top pillar)
+    domain, category = frame['Domain'].astype(str).to_numpy(), frame['Category'].astype(str).to_numpy()
+    scored = frame['Sentiment'].notna().to_numpy()
+    sentiment = frame['Sentiment'].to_numpy(dtype=np.float64)[scored]
+    mids = (bins[:-1] + bins[1:]) / 2
+    sentiment_cube = pd.DataFrame({
+        'Domain': domain[scored],
+        'Category': category[scored],
+        'Sentiment': np.asarray(pd.cut(sentiment, bins, labels=mids, include_lowest=True), dtype=np.float64),
+        'Reviews': 1,
+        'Sentiment Sum': sentiment,
+    }).groupby(SENTIMENT_KEYS, sort=False).sum().reset_index()
+    mentioned = frame['Top Pillar'].notna().to_numpy()
+    pillar_cube = pd.DataFrame({
+        'Domain': domain[mentioned],
+        'Category': category[mentioned],
+        'Top Pillar': frame['Top Pillar'].astype(object).to_numpy()[mentioned],
+        'Reviews': 1,
+    }).groupby(PILLAR_MIX_KEYS, sort=False).sum().reset_index()
+    return sentiment_cube, pillar_cube
+
+
+def score_distribution(cube, by='Domain', domains=None, categories=None):
+    # Share of each group's scored reviews per sentiment bin, with the group mean
+    cells = select_cells(cube, domains, categories)
+    dist = cells.groupby([by, 'Sentiment'])[['Reviews', 'Sentiment Sum']].sum().reset_index()
+    dist = dist[dist['Reviews'] > 0].rename(columns={by: 'Group'})
+    totals = dist.groupby('Group')['Reviews'].transform('sum')
+    dist['Share'] = dist['Reviews'] / totals
+    dist['Mean Sentiment'] = dist.groupby('Group')['Sentiment Sum'].transform('sum') / totals
+    return dist.drop(columns='Sentiment Sum').reset_index(drop=True)
+
+
+def pillar_mix(cube, by='Domain', domains=None, categories=None):
+    # Reviews per (group, top pillar), for reviews that mention any pillar
+    cells = select_cells(cube, domains, categories)
+    mix = cells.groupby([by, 'Top Pillar'])['Reviews'].sum()
+    return mix[mix > 0].reset_index().set_axis(['Group', 'Top Pillar', 'Reviews'], axis=1)
+
+
+# --- NEAR-DUPLICATE CLUSTERS ---
+# Templated reviews ("Great job!", "Highly recommended.") are grouped so the feed can
+# collapse them and the analytics can count each cluster once. Identical texts are
+# matched by hash; the remaining distinct texts get MinHash signatures over word
+# unigrams and bigrams, and LSH band buckets propose candidate pairs (a bounded
+# number per bucket), which are kept when their estimated Jaccard similarity
+# reaches DUPLICATE_SIMILARITY. Reviews with different ratings are never grouped:
+# a 1-star "Great job" is not a 5-star one.
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+DUPLICATE_SIMILARITY = 0.7
+MINHASH_BATCH_TEXTS = 20_000
+# A text is compared with at most the first DUPLICATE_CANDIDATES texts sharing each
+# of its band keys, so a bucket of thousands of templated reviews costs linear work
+DUPLICATE_CANDIDATES = 8
+# Candidate pairs compared per step, to bound the (pairs x permutations) temporaries
+SIMILARITY_CHUNK = 100_000
+# Multiply-shift hashing: the top 32 bits of (a * x + b) mod 2**64, with a odd
+_MINHASH_RNG = np.random.default_rng(20240611)
+MINHASH_A = _MINHASH_RNG.integers(0, 2**63, MINHASH_PERMUTATIONS, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+MINHASH_B = _MINHASH_RNG.integers(0, 2**63, MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+
+def shingle_hashes(texts):
+    # (text position, 32-bit shingle hash) pairs for word unigrams and bigrams
+    tokens = pd.Series(texts, dtype=object).str.split().explode().dropna()
+    pos = tokens.index.to_numpy(dtype=np.int64)
+    h = pd.util.hash_array(tokens.to_numpy(dtype=object))
+    same = pos[1:] == pos[:-1]
+    with np.errstate(over='ignore'):
+        bigrams = (h[:-1] * np.uint64(0x9E3779B97F4A7C15)) ^ h[1:]
+    pos = np.concatenate([pos, pos[:-1][same]])
+    h = np.concatenate([h, bigrams[same]])
+    # Two sorted runs, so the stable sort is a single merge
+    order = np.argsort(pos, kind='stable')
+    return pos[order], (h[order] ^ (h[order] >> np.uint64(32))) & np.uint64(0xFFFFFFFF)
+
+
+def minhash_signatures(texts):
+    # (len(texts) x MINHASH_PERMUTATIONS) uint32; every text must have at least one token.
+    # One 1-D reduceat per permutation: reducing a 2-D block along axis 0 is ~10x slower.
+    sigs = np.empty((MINHASH_PERMUTATIONS, len(texts)), dtype=np.uint32)
+    shift = np.uint64(32)
+    for start in range(0, len(texts), MINHASH_BATCH_TEXTS):
+        pos, h = shingle_hashes(texts[start:start + MINHASH_BATCH_TEXTS])
+        bounds = np.flatnonzero(np.r_[True, pos[1:] != pos[:-1]])
+        rows = start + pos[bounds]
+        with np.errstate(over='ignore'):
+            for p in range(MINHASH_PERMUTATIONS):
+                sigs[p, rows] = np.minimum.reduceat((h * MINHASH_A[p] + MINHASH_B[p]) >> shift, bounds)
+    return np.ascontiguousarray(sigs.T)
+
+
+def band_keys(sigs, ratings):
+    # One 64-bit bucket key per LSH band (rows x LSH_BANDS), seeded with the rating
+    # so only reviews with the same rating share a bucket
+    per_band = MINHASH_PERMUTATIONS // LSH_BANDS
+    bands = np.ascontiguousarray(sigs).reshape(len(sigs), LSH_BANDS, per_band)
+    keys = np.repeat(np.asarray(ratings, dtype=np.int64).astype(np.uint64)[:, None], LSH_BANDS, axis=1)
+    with np.errstate(over='ignore'):
+        for j in range(per_band):
+            keys = keys * np.uint64(0x100000001B3) ^ bands[:, :, j].astype(np.uint64)
+    return keys
+
+
+def similarity(sigs_a, sigs_b):
+    # Estimated Jaccard similarity of paired rows
+    return (sigs_a == sigs_b).mean(axis=1)
+
+
+def pair_similarity(sigs_a, left, sigs_b, right):
+    # similarity(sigs_a[left], sigs_b[right]), a chunk of pairs at a time
+    out = np.empty(len(left))
+    for start in range(0, len(left), SIMILARITY_CHUNK):
+        stop = start + SIMILARITY_CHUNK
+        out[start:stop] = similarity(sigs_a[left[start:stop]], sigs_b[right[start:stop]])
+    return out
+
+
+def rating_codes(ratings):
+    # Ratings as int64 for grouping, with missing ratings as -1
+    return pd.Series(ratings).astype('Int64').fillna(-1).to_numpy(dtype=np.int64)
+
+
+def leader_clusters(n, later, earlier, placed=None):
+    # Greedy leader clustering over range(n) in index order: a node joins the earliest
+    # similar node that leads a cluster, or leads a new one. Unlike connected
+    # components this never chains dissimilar texts together through a middle one.
+    # Nodes in `placed` already joined a cluster elsewhere and never lead (their
+    # result is n). Nodes are decided in rounds, once every earlier neighbour has been decided.
+    leader = np.full(n, -1, dtype=np.int64)
+    if placed is not None:
+        leader[placed] = n
+    while (leader < 0).any():
+        undecided = leader < 0
+        blocked = np.zeros(n, dtype=bool)
+        blocked[later[undecided[later] & undecided[earlier]]] = True
+        ready = undecided & ~blocked
+        best = np.full(n, n, dtype=np.int64)
+        joins = ready[later] & (leader[earlier] == earlier)
+        np.minimum.at(best, later[joins], earlier[joins])
+        ready_nodes = np.flatnonzero(ready)
+        leader[ready_nodes] = np.where(best[ready_nodes] < n, best[ready_nodes], ready_nodes)
+    return leader
+
+
+def bucket_runs(keys):
+    # Stable order of `keys` plus, per sorted position, the start of its run of
+    # equal keys and its rank within that run
+    order = np.argsort(keys, kind='stable')
+    k = keys[order]
+    first = np.r_[True, k[1:] != k[:-1]] if len(k) else np.zeros(0, dtype=bool)
+    start = np.flatnonzero(first)[np.cumsum(first) - 1]
+    return order, start, np.arange(len(k)) - start
+
+
+class NearDuplicates:
+    # Grows with the dataset: every distinct (text, rating) seen so far maps to a
+    # cluster ID (the row position of the cluster's first review). In row order a
+    # text joins the earliest similar cluster leader among its candidates -- the
+    # first DUPLICATE_CANDIDATES earlier texts with each of its band keys -- or
+    # leads a new cluster. Those first texts per band key are all that is kept in
+    # the sorted band tables, so a batch clusters exactly as a full rebuild would.
+
+    def __init__(self):
+        self.text_keys = np.empty(0, dtype=np.uint64)
+        self.text_clusters = np.empty(0, dtype=np.int64)
+        self.member_sigs = np.empty((0, MINHASH_PERMUTATIONS), dtype=np.uint32)
+        self.member_ratings = np.empty(0, dtype=np.int64)
+        self.member_clusters = np.empty(0, dtype=np.int64)
+        self.member_leads = np.empty(0, dtype=bool)
+        self.band_tables = [(np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64))] * LSH_BANDS
+
+    def match_members(self, sigs, ratings, keys):
+        # Earliest similar cluster leader per signature among the stored candidates,
+        # or -1, and how many candidate slots each (signature, band key) has used up
+        best = np.full(len(sigs), -1, dtype=np.int64)
+        taken = np.zeros(keys.shape, dtype=np.int64)
+        if not len(self.member_clusters):
+            return best, taken
+        query, members = [], []
+        for j, (table, table_members) in enumerate(self.band_tables):
+            # Sorted lookups walk the table once instead of jumping around it
+            order = np.argsort(keys[:, j])
+            lo = np.searchsorted(table, keys[order, j], side='left')
+            counts = np.searchsorted(table, keys[order, j], side='right') - lo
+            taken[order, j] = counts
+            query.append(np.repeat(order, counts))
+            within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            members.append(table_members[np.repeat(lo, counts) + within])
+        # A pair that shares several buckets is compared once; only leaders can be joined
+        n_members = len(self.member_clusters)
+        pairs = np.unique(np.concatenate(query) * n_members + np.concatenate(members))
+        query, members = np.divmod(pairs, n_members)
+        usable = self.member_leads[members] & (ratings[query] == self.member_ratings[members])
+        query, members = query[usable], members[usable]
+        keep = pair_similarity(sigs, query, self.member_sigs, members) >= DUPLICATE_SIMILARITY
+        earliest = np.full(len(sigs), np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(earliest, query[keep], self.member_clusters[members[keep]])
+        found = earliest < np.iinfo(np.int64).max
+        best[found] = earliest[found]
+        return best, taken
+
+    def cluster_new(self, sigs, ratings, keys, taken, matched):
+        # Leader per signature (in row order) over the candidate pairs within the
+        # batch: each text pairs with the earlier texts of its bucket that still fit
+        # in the bucket's DUPLICATE_CANDIDATES slots. Also returns, per band, the
+        # texts that take a slot.
+        later, earlier, slotted = [], [], []
+        for j in range(LSH_BANDS):
+            order, start, rank = bucket_runs(keys[:, j])
+            free = np.maximum(DUPLICATE_CANDIDATES - taken[order, j], 0)
+            ahead = np.minimum(rank, free)
+            within = np.arange(ahead.sum()) - np.repeat(np.cumsum(ahead) - ahead, ahead)
+            later.append(np.repeat(order, ahead))
+            earlier.append(order[np.repeat(start, ahead) + within])
+            slotted.append(order[rank < free])
+        pairs = np.unique(np.concatenate(later) * len(sigs) + np.concatenate(earlier))
+        later, earlier = np.divmod(pairs, len(sigs))
+        same = ratings[later] == ratings[earlier]
+        later, earlier = later[same], earlier[same]
+        keep = pair_similarity(sigs, later, sigs, earlier) >= DUPLICATE_SIMILARITY
+        return leader_clusters(len(sigs), later[keep], earlier[keep], placed=matched >= 0), slotted
+
+    def add_members(self, sigs, ratings, keys, clusters, leads, slotted):
+        # Texts that took a candidate slot join the band tables; existing keys are
+        # not re-hashed
+        added = np.unique(np.concatenate(slotted))
+        index = np.full(len(sigs), -1, dtype=np.int64)
+        index[added] = len(self.member_clusters) + np.arange(len(added))
+        self.member_sigs = np.concatenate([self.member_sigs, sigs[added]])
+        self.member_ratings = np.concatenate([self.member_ratings, ratings[added]])
+        self.member_clusters = np.concatenate([self.member_clusters, clusters[added]])
+        self.member_leads = np.concatenate([self.member_leads, leads[added]])
+        tables = []
+        for j, (table, members) in enumerate(self.band_tables):
+            rows = slotted[j]
+            at = np.searchsorted(table, keys[rows, j], side='right')
+            # Same-key texts arrive in row order, so each bucket stays oldest first
+            tables.append((np.insert(table, at, keys[rows, j]), np.insert(members, at, index[rows])))
+        self.band_tables = tables
+
+    def assign(self, reviews, ratings, row_offset=0, skip=None):
+        # Cluster ID per review; rows in `skip` (placeholders) and texts without
+        # words are never clustered and keep their own row position
+        # Whitespace runs collapsed, so spacing alone never tells two texts apart
+        text = np.array([' '.join(t.split()) for t in normalize_review(reviews)], dtype=object)
+        rows = np.arange(row_offset, row_offset + len(text), dtype=np.int64)
+        clusters = rows.copy()
+        usable = text != ''
+        if skip is not None:
+            usable &= ~np.asarray(skip)
+        if not usable.any():
+            return clusters
+
+        text = text[usable]
+        rating = rating_codes(ratings)[usable]
+        keys = pd.util.hash_pandas_object(pd.DataFrame({'Text': text, 'Rating': rating}), index=False).to_numpy()
+        uniq, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        first_row = rows[usable][first]
+        uniq_rating = rating[first]
+        uniq_cluster = np.full(len(uniq), -1, dtype=np.int64)
+
+        # 1. (text, rating) pairs seen before
+        pos = np.minimum(np.searchsorted(self.text_keys, uniq), max(len(self.text_keys) - 1, 0))
+        known = (self.text_keys[pos] == uniq) if len(self.text_keys) else np.zeros(len(uniq), dtype=bool)
+        uniq_cluster[known] = self.text_clusters[pos[known]]
+
+        # 2. new texts in row order: a similar leader from earlier batches wins, else
+        #    the earliest similar leader within the batch, else the text leads
+        new = np.flatnonzero(~known)
+        if len(new):
+            new = new[np.argsort(first_row[new], kind='stable')]
+            sigs = minhash_signatures(text[first[new]])
+            new_rating = uniq_rating[new]
+            bkeys = band_keys(sigs, new_rating)
+            matched, taken = self.match_members(sigs, new_rating, bkeys)
+            leader, slotted = self.cluster_new(sigs, new_rating, bkeys, taken, matched)
+            leads = leader == np.arange(len(new))
+            cluster = np.where(matched >= 0, matched, first_row[new][np.minimum(leader, len(new) - 1)])
+            uniq_cluster[new] = cluster
+            self.add_members(sigs, new_rating, bkeys, cluster, leads, slotted)
+
+            new = np.sort(new)
+            at = np.searchsorted(self.text_keys, uniq[new])
+            self.text_keys = np.insert(self.text_keys, at, uniq[new])
+            self.text_clusters = np.insert(self.text_clusters, at, uniq_cluster[new])
+
+        clusters[usable] = uniq_cluster[inverse]
+        return clusters
+
+
+def cluster_sizes(clusters, row_mask=None):
+    # Reviews in each row's cluster, counting only rows in row_mask if given
+    members = clusters if row_mask is None else clusters[np.asarray(row_mask)]
+    counts = np.bincount(members, minlength=len(clusters))
+    return counts[clusters].astype(np.int32)
+
+
+def collapse_clusters(rows, clusters):
+    # First row of each cluster, in the given row order, and how many of `rows`
+    # each one stands for
+    _, first, counts = np.unique(clusters[rows], return_index=True, return_counts=True)
+    order = np.argsort(first)
+    return rows[first[order]], counts[order]
+
+
+# --- FEED ORDER & FILTER BITMAPS ---
+# Built once per data version: one row permutation per feed sort and one packed
+# bitmap per Domain / Category value. A sidebar selection is then a few ORs and
+# ANDs over n/8 bytes, and the sorted feed a gather on a precomputed order.
+FEED_SORTS = {
+    'Newest first': ('Date', True),
+    'Oldest first': ('Date', False),
+    'Highest rated': ('Rating', True),
+    'Lowest rated': ('Rating', False),
+    'Client (A-Z)': ('Client Name', False),
+}
+FILTER_COLUMNS = ['Domain', 'Category']
+
+
+def sort_key(frame, column, descending=False):
+    # Ascending key whose stable argsort gives the feed order; missing values sort last
+    values = frame[column]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        cats = values.cat.categories
+        rank = np.empty(len(cats), dtype=np.int64)
+        rank[np.argsort(cats.str.casefold(), kind='stable')] = np.arange(len(cats))
+        codes = values.cat.codes.to_numpy()
+        key = np.where(codes >= 0, rank[codes], len(cats))
+        return np.where(codes >= 0, len(cats) - 1 - key, key) if descending else key
+    if pd.api.types.is_datetime64_any_dtype(values):
+        # NaT is the smallest int64, so flipping the bits puts it last when descending
+        key = values.to_numpy().view('i8')
+        return ~key if descending else np.where(key == np.iinfo(np.int64).min, np.iinfo(np.int64).max, key)
+    key = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    return -key if descending else key
+
+
+def position_dtype(n_rows):
+    return np.int32 if n_rows < 2**31 else np.int64
+
+
+def sort_orders(frame, sorts=FEED_SORTS):
+    dtype = position_dtype(len(frame))
+    return {
+        name: np.argsort(sort_key(frame, column, descending), kind='stable').astype(dtype)
+        for name, (column, descending) in sorts.items()
+    }
+
+
+def extend_orders(orders, frame, offset, sorts=FEED_SORTS):
+    # Merge rows appended at `offset` into each order without re-sorting the rest;
+    # the new rows land after existing rows with an equal key, which keeps ties in row order.
+    dtype = position_dtype(len(frame))
+    merged = {}
+    for name, (column, descending) in sorts.items():
+        key = sort_key(frame, column, descending)
+        batch_key = key[offset:]
+        batch_order = np.argsort(batch_key, kind='stable')
+        at = np.searchsorted(key[orders[name]], batch_key[batch_order], side='right')
+        merged[name] = np.insert(orders[name].astype(dtype), at, (batch_order + offset).astype(dtype))
+    return merged
+
+
+def in_order(order, row_mask):
+    # Selected rows, in the order of a precomputed permutation
+    return order[row_mask[order]]
+
+
+def append_bits(packed, n_rows, flags):
+    # Extend a packed bitmap of n_rows bits with new flags; only the last partial byte is repacked
+    full = n_rows // 8
+    tail = np.unpackbits(packed[full:], count=n_rows - full * 8)
+    return np.concatenate([packed[:full], np.packbits(np.concatenate([tail, flags.astype(np.uint8)]))])
+
+
+class RowBitmaps:
+    def __init__(self, n_rows, bits):
+        # bits: {column: {value: packed uint8 row bitmap}}
+        self.n_rows = n_rows
+        self.bits = bits
+
+    @classmethod
+    def from_frame(cls, frame, columns=FILTER_COLUMNS):
+        bits = {}
+        for col in columns:
+            values = frame[col].astype('category')
+            codes = values.cat.codes.to_numpy()
+            bits[col] = {str(v): np.packbits(codes == i) for i, v in enumerate(values.cat.categories)}
+        return cls(len(frame), bits)
+
+    def extend(self, frame, offset):
+        # Bitmaps for frame, given that rows before `offset` are already covered
+        bits = {}
+        empty = np.zeros((offset + 7) // 8, dtype=np.uint8)
+        for col, by_value in self.bits.items():
+            batch = frame[col].iloc[offset:].astype(object).to_numpy()
+            new = [str(v) for v in pd.unique(batch) if pd.notna(v) and str(v) not in by_value]
+            bits[col] = {
+                v: append_bits(by_value.get(v, empty), offset, batch.astype(str) == v)
+                for v in list(by_value) + new
+            }
+        return RowBitmaps(len(frame), bits)
+
+    def column_bits(self, column, values):
+        packed = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+        for value in values:
+            if value in self.bits[column]:
+                packed |= self.bits[column][value]
+        return packed
+
+    def values(self, column, within=None, values=None):
+        # Values of `column` present in the data, or in rows whose `within` column
+        # is one of `values` -- the sidebar's options, without touching the frame
+        rows = self.column_bits(within, values) if within else None
+        return sorted(
+            v for v, bits in self.bits[column].items() if (bits if rows is None else bits & rows).any()
+        )
+
+    def select(self, domains=None, categories=None):
+        # Same result as selection_mask(); None means "all"
+        packed = np.full((self.n_rows + 7) // 8, 0xFF, dtype=np.uint8)
+        for column, values in (('Domain', domains), ('Category', categories)):
+            if values is not None:
+                packed &= self.column_bits(column, values)
+        return np.unpackbits(packed, count=self.n_rows).view(bool)
+
+    def to_table(self):
+        keys = [(col, value) for col, by_value in self.bits.items() for value in by_value]
+        return pa.table({
+            'Column': pa.array([col for col, _ in keys], pa.string()),
+            'Value': pa.array([value for _, value in keys], pa.string()),
+            'Bits': pa.array([self.bits[col][value].tobytes() for col, value in keys], pa.binary()),
+        })
+
+    @classmethod
+    def from_table(cls, table, n_rows):
+        # Bitmaps stay views over the (memory-mapped) table buffers
+        bits = {}
+        packed = table.column('Bits').combine_chunks()
+        keys = zip(table.column('Column').to_pylist(), table.column('Value').to_pylist())
+        for i, (col, value) in enumerate(keys):
+            bits.setdefault(col, {})[value] = np.frombuffer(packed[i].as_buffer(), dtype=np.uint8)
+        return cls(n_rows, bits)
+
+
+# --- DERIVED FEATURES ---
+# Everything below depends only on the dataset, never on widget state, so it is
+# computed once per data version and every rerun is a lookup into this result.
+RATING_GROUPS = ['5 Star', '4 Star', '1-2 Star']
+# The chronological copy only carries what the streak analytics read, not review text
+CHRONO_COLUMNS = STREAK_CHART_COLUMNS
+
+
+def rating_groups(ratings):
+    ratings = np.asarray(ratings, dtype=np.float64)
+    groups = np.select([ratings == 5.0, ratings == 4.0], RATING_GROUPS[:2], RATING_GROUPS[2])
+    return pd.Categorical(groups, categories=RATING_GROUPS)
+
+
+def chronology(frame):
+    # Chronological order and 1-based ordinal; NaT dates sort last, ties keep load order
+    chrono_order = np.argsort(frame['Date'].to_numpy(), kind='stable')
+    ordinal = np.empty(len(frame), dtype=np.int64)
+    ordinal[chrono_order] = np.arange(1, len(frame) + 1)
+    return chrono_order, ordinal
+
+
+def derive_columns(df, score_caches):
+    df = df.assign(**{'Rating Group': rating_groups(df['Rating'])})
+    # Placeholder reviews carry no text worth scoring. The stripped text is only
+    # needed here and per rendered page, so the frame keeps a single text column.
+    scores = score_reviews(df['Review'].fillna('').str.strip().where(~df['Is Placeholder']), score_caches)
+    return pd.concat([df, scores.set_axis(df.index)], axis=1)
+
+
+def concat_frames(head, tail):
+    # pd.concat falls back to object dtype when categories differ, so align them first
+    head, tail = head.copy(deep=False), tail.copy(deep=False)
+    for col in head.columns:
+        if isinstance(head[col].dtype, pd.CategoricalDtype):
+            cats = head[col].cat.categories
+            cats = cats.append(tail[col].astype('category').cat.categories.difference(cats))
+            head[col] = head[col].cat.set_categories(cats)
+            tail[col] = tail[col].astype(pd.CategoricalDtype(cats))
+    return pd.concat([head, tail], ignore_index=True)
+
+
+def build_features(df, score_cache=SCORE_CACHE_DIR):
+    # The score caches stay with the features, so later batches only look up their own texts
+    score_caches = open_score_caches(score_cache)
+    frame = derive_columns(df, score_caches)
+    chrono_order, frame['Review #'] = chronology(frame)
+    duplicates = NearDuplicates()
+    clusters = duplicates.assign(frame['Review'], frame['Rating'], skip=frame['Is Placeholder'])
+    frame['Cluster'] = clusters.astype(position_dtype(len(frame)))
+    frame['Cluster Size'] = cluster_sizes(clusters)
+    df_sorted = frame[CHRONO_COLUMNS].iloc[chrono_order].reset_index(drop=True)
+
+    index = SegmentedIndex([ReviewIndex(frame['Review'])])
+    hits = keyword_hits(index, PILLARS, KEYWORDS)
+    sentiment_cube, pillar_cube = build_score_rollups(frame)
+    return {
+        'frame': frame,
+        'chronological': df_sorted,
+        'chrono_order': chrono_order,
+        'orders': sort_orders(frame),
+        'bitmaps': RowBitmaps.from_frame(frame),
+        'index': index,
+        'hits': hits,
+        'rollup': build_rollup(frame, hits),
+        'sentiment_rollup': sentiment_cube,
+        'pillar_rollup': pillar_cube,
+        'duplicates': duplicates,
+        'scores': score_caches,
+    }
+
+
+def extend_features(features, batch):
+    # Fold a batch of new, already prepared rows into an existing feature set.
+    # Tokenizing, keyword matching, scoring and rollups only touch the batch.
+    frame = features['frame']
+    offset = len(frame)
+    batch = derive_columns(batch.reset_index(drop=True), features['scores'])
+    batch_order, batch_ordinal = chronology(batch)
+    # Cluster IDs are row positions, so existing ones stay valid; only sizes change
+    clusters = features['duplicates'].assign(
+        batch['Review'], batch['Rating'], row_offset=offset, skip=batch['Is Placeholder']
+    )
+    batch['Cluster'] = clusters.astype(position_dtype(offset + len(batch)))
+    batch['Cluster Size'] = np.int32(0)
+
+    last_date = features['chronological']['Date'].iloc[-1] if offset else None
+    batch_dates = batch['Date']
+    if offset and pd.notna(last_date) and batch_dates.notna().all() and batch_dates.min() >= last_date:
+        # Common case: the batch is newer than everything seen, so ordinals just continue
+        batch['Review #'] = batch_ordinal + offset
+        frame = concat_frames(frame, batch)
+        chrono_order = np.concatenate([features['chrono_order'], batch_order + offset])
+        df_sorted = concat_frames(features['chronological'], batch[CHRONO_COLUMNS].iloc[batch_order])
+    else:
+        frame = concat_frames(frame, batch.assign(**{'Review #': 0}))
+        chrono_order, frame['Review #'] = chronology(frame)
+        df_sorted = frame[CHRONO_COLUMNS].iloc[chrono_order].reset_index(drop=True)
+
+    frame['Cluster Size'] = cluster_sizes(frame['Cluster'].to_numpy())
+
+    segment = ReviewIndex(batch['Review'], row_offset=offset)
+    batch_hits = keyword_hits(segment, PILLARS, KEYWORDS)
+    sentiment_cube, pillar_cube = build_score_rollups(batch)
+    return {
+        'frame': frame,
+        'chronological': df_sorted,
+        'chrono_order': chrono_order,
+        'orders': extend_orders(features['orders'], frame, offset),
+        'bitmaps': features['bitmaps'].extend(frame, offset),
+        'index': features['index'].with_segment(segment, frame['Review']),
+        'hits': pd.concat([features['hits'], batch_hits], ignore_index=True),
+        'rollup': merge_rollup(features['rollup'], build_rollup(batch, batch_hits, row_offset=offset)),
+        'sentiment_rollup': merge_rollup(features['sentiment_rollup'], sentiment_cube, SENTIMENT_KEYS),
+        'pillar_rollup': merge_rollup(features['pillar_rollup'], pillar_cube, PILLAR_MIX_KEYS),
+        'duplicates': features['duplicates'],
+        'scores': features['scores'],
+    }
+
+
+# --- LIVE INGEST ---
+# New reviews arrive either appended to DATA_FILE or as CSV / JSONL batch files
+# dropped into INBOX_DIR. Only bytes past the last consumed offset are parsed.
+INBOX_DIR = 'incoming'
+INGEST_COLUMNS = ['Category', 'Date', 'Client Name', 'Rating', 'Review']
+DEDUPE_COLUMNS = ['Client Name', 'Date', 'Category']
+
+
+def review_keys(df):
+    keys = pd.DataFrame({
+        'Client Name': df['Client Name'].astype(str),
+        'Date': df['Date'].dt.normalize(),
+        'Category': df['Category'].astype(str),
+    })
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+def tail_digest(file_path, offset, span=4096):
+    # Fingerprint of the bytes just before `offset`, to tell an append from a rewrite
+    with open(file_path, 'rb') as f:
+        f.seek(max(offset - span, 0))
+        return hashlib.sha256(f.read(min(offset, span))).hexdigest()
+
+
+class LiveDataset:
+    # Long-lived dataset that grows in place (the dashboard keeps one per process).
+    # poll() is cheap when nothing changed: a stat of the CSV and the domain rules
+    # and one scandir. An edited rules file or a rewritten CSV is rebuilt on a
+    # background thread; reruns keep the current features until it is swapped in.
+
+    def __init__(self, csv_path=DATA_FILE, inbox_dir=INBOX_DIR):
+        self.csv_path = csv_path
+        self.inbox_dir = inbox_dir
+        self.lock = threading.Lock()
+        self.version = 0
+        self.reloading = None
+        self.reload_error = None
+        self.reload()
+
+    def load(self):
+        # Fresh ingest state for the CSV under the current rules; leaves self untouched
+        state = {
+            'rules_mtime': source_mtime(DOMAIN_RULES_FILE),
+            'rules': load_domain_rules(),
+            'offsets': {},
+            'headers': {},
+            'csv_tail': None,
+        }
+        if os.path.exists(self.csv_path):
+            # Taken before parsing: rows appended meanwhile are re-read and deduped
+            size = os.path.getsize(self.csv_path)
+            state['offsets'][self.csv_path] = size
+            state['headers'][self.csv_path] = list(pd.read_csv(self.csv_path, nrows=0).columns)
+            state['csv_tail'] = tail_digest(self.csv_path, size)
+        df = load_data(self.csv_path, state['rules'])
+        state['features'] = build_features(df)
+        state['keys'] = np.sort(review_keys(df))
+        state['last_ingest'] = None
+        return state
+
+    def reload(self):
+        for name, value in self.load().items():
+            setattr(self, name, value)
+        self.version += 1
+
+    def start_reload(self):
+        if self.reloading is None or not self.reloading.is_alive():
+            self.reloading = threading.Thread(target=self.reload_in_background, name='review-reload', daemon=True)
+            self.reloading.start()
+
+    def reload_in_background(self):
+        rules_mtime = source_mtime(DOMAIN_RULES_FILE)
+        try:
+            state = self.load()
+        except Exception as exc:  # keep serving the current features
+            with self.lock:
+                # Not retried until the rules file changes again
+                self.rules_mtime, self.reload_error = rules_mtime, f"{type(exc).__name__}: {exc}"
+            return
+        with self.lock:
+            for name, value in state.items():
+                setattr(self, name, value)
+            self.reload_error = None
+            self.version += 1
+
+    def read_new_rows(self, file_path):
+        offset = self.offsets.get(file_path, 0)
+        with open(file_path, 'rb') as f:
+            f.seek(offset)
+            chunk = f.read()
+        # Stop at the last complete line; a half-written row is picked up next time
+        end = chunk.rfind(b'\n') + 1
+        if end == 0:
+            return None
+        self.offsets[file_path] = offset + end
+        data = io.BytesIO(chunk[:end])
+
+        if file_path.endswith('.jsonl'):
+            batch = pd.read_json(data, lines=True, dtype=False, convert_dates=False)
+        elif file_path in self.headers:
+            batch = pd.read_csv(data, header=None, names=self.headers[file_path])
+        else:
+            batch = pd.read_csv(data)
+            self.headers[file_path] = list(batch.columns)
+        return batch.reindex(columns=INGEST_COLUMNS)
+
+    def pending_files(self):
+        changed = []
+        if os.path.exists(self.csv_path) and os.path.getsize(self.csv_path) > self.offsets[self.csv_path]:
+            changed.append(self.csv_path)
+        if os.path.isdir(self.inbox_dir):
+            for entry in sorted(os.scandir(self.inbox_dir), key=lambda e: e.name):
+                if entry.name.endswith(('.csv', '.jsonl')) and entry.stat().st_size > self.offsets.get(entry.path, 0):
+                    changed.append(entry.path)
+        return changed
+
+    def source_replaced(self):
+        if not os.path.exists(self.csv_path):
+            return self.csv_path in self.offsets
+        offset = self.offsets.get(self.csv_path)
+        return offset is None or os.path.getsize(self.csv_path) < offset \
+            or tail_digest(self.csv_path, offset) != self.csv_tail
+
+    def poll(self):
+        with self.lock:
+            if self.reloading is not None and self.reloading.is_alive():
+                # The rebuild re-reads everything, so there is nothing to ingest meanwhile
+                return 0
+            if self.source_replaced() or source_mtime(DOMAIN_RULES_FILE) != self.rules_mtime:
+                self.start_reload()
+                return 0
+            pending = self.pending_files()
+            batches = [b for b in map(self.read_new_rows, pending) if b is not None]
+            if self.csv_path in pending:
+                self.csv_tail = tail_digest(self.csv_path, self.offsets[self.csv_path])
+            if not batches:
+                return 0
+
+            batch = prepare_frame(pd.concat(batches, ignore_index=True), self.rules)
+            keys = review_keys(batch)
+            fresh = ~pd.Series(keys).duplicated().to_numpy()
+            if len(self.keys):
+                pos = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+                fresh &= self.keys[pos] != keys
+            new_keys = np.sort(keys[fresh])
+            self.keys = np.insert(self.keys, np.searchsorted(self.keys, new_keys), new_keys)
+
+            if fresh.any():
+                self.features = extend_features(self.features, batch[fresh])
+                self.version += 1
+            self.last_ingest = (int(fresh.sum()), int((~fresh).sum()), pd.Timestamp.now())
+            return int(fresh.sum())
+
+
+# --- MULTI-SOURCE LOADING ---
+# Reviews aggregated from several exports (per region / platform account): local
+# CSV or JSONL files, directories of them, and http(s) endpoints. Sources are read
+# concurrently, merged under the store schema and deduplicated like live ingest.
+SOURCE_WORKERS = 8
+SOURCE_TIMEOUT = 10
+# Seconds between background refreshes
+REFRESH_INTERVAL = 300
+
+
+def is_url(source):
+    return source.startswith(('http://', 'https://'))
+
+
+def parse_sources(spec):
+    # Comma-separated list, as given in DASHBOARD_SOURCES
+    return [part.strip() for part in (spec or '').split(',') if part.strip()]
+
+
+def fetch_url(url, timeout=SOURCE_TIMEOUT):
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return response.read(), response.headers.get('Content-Type', '')
+
+
+def read_export(data, name, content_type=''):
+    # One CSV or JSONL export (path or bytes) as raw INGEST_COLUMNS rows
+    if isinstance(data, bytes):
+        data = io.BytesIO(data)
+    if name.endswith('.jsonl') or 'ndjson' in content_type or 'jsonl' in content_type:
+        frame = pd.read_json(data, lines=True, dtype=False, convert_dates=False)
+    else:
+        frame = pd.read_csv(data)
+    return frame.reindex(columns=INGEST_COLUMNS)
+
+
+def source_files(source):
+    if os.path.isdir(source):
+        return sorted(e.path for e in os.scandir(source) if e.name.endswith(('.csv', '.jsonl')))
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"review source not found: {source}")
+    return [source]
+
+
+def source_fingerprint(source, fetch=fetch_url):
+    # Cheap change check: (name, mtime, size) per file; URLs are fetched and hashed,
+    # and the body is returned so an unchanged check never downloads twice
+    if is_url(source):
+        body, content_type = fetch(source)
+        return hashlib.sha256(body).hexdigest(), (body, content_type)
+    return tuple((p, os.path.getmtime(p), os.path.getsize(p)) for p in source_files(source)), None
+
+
+def read_source(source, rules, fetched=None):
+    if is_url(source):
+        body, content_type = fetched
+        return prepare_frame(read_export(body, urllib.parse.urlparse(source).path, content_type), rules)
+    frames = []
+    for path in source_files(source):
+        # Local CSVs go through the columnar store; JSONL is parsed each time
+        frames.append(load_data(path, rules) if path.endswith('.csv') else prepare_frame(read_export(path, path), rules))
+    return functools.reduce(concat_frames, frames) if frames else None
+
+
+def read_sources(sources, rules, fetch=fetch_url, workers=SOURCE_WORKERS, fingerprints=None):
+    # [(source, frame, fingerprint, error, seconds)] read on a thread pool; frame is
+    # None when the source failed or its fingerprint matches `fingerprints`
+    fingerprints = fingerprints or {}
+
+    def read_one(source):
+        start = time.perf_counter()
+        try:
+            fingerprint, fetched = source_fingerprint(source, fetch)
+            frame = None if fingerprint == fingerprints.get(source) else read_source(source, rules, fetched)
+            return source, frame, fingerprint, None, time.perf_counter() - start
+        except Exception as exc:  # one bad export must not take the others down
+            return source, None, None, f"{type(exc).__name__}: {exc}", time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=max(min(workers, len(sources)), 1)) as pool:
+        return list(pool.map(read_one, sources))
+
+
+def merge_sources(frames):
+    # Same review exported by two accounts: keep the first source's copy. Rows
+    # repeated within one source are left alone, as with a single CSV.
+    frames = [f for f in frames if f is not None and len(f)]
+    if not frames:
+        return None
+    seen = np.empty(0, dtype=np.uint64)
+    kept, skipped = [], 0
+    for frame in frames:
+        keys = review_keys(frame)
+        dupes = np.isin(keys, seen)
+        kept.append(frame[~dupes])
+        skipped += int(dupes.sum())
+        seen = np.union1d(seen, keys)
+    return functools.reduce(concat_frames, kept).reset_index(drop=True), skipped
+
+
+class MultiSourceDataset:
+    # Drop-in for LiveDataset over several sources. The first load is synchronous;
+    # after that a daemon thread re-reads every REFRESH_INTERVAL seconds and swaps in
+    # the rebuilt features only when it succeeds, so reruns never wait on a refresh
+    # and a failing source keeps its last good rows. An edited rules file wakes the
+    # thread early to re-read every source under the new rules.
+
+    def __init__(self, sources, refresh_interval=REFRESH_INTERVAL, fetch=fetch_url, workers=SOURCE_WORKERS):
+        self.sources = list(sources)
+        self.refresh_interval = refresh_interval
+        self.fetch = fetch
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.rules_mtime = source_mtime(DOMAIN_RULES_FILE)
+        self.rules = load_domain_rules()
+        self.frames = {}
+        self.fingerprints = {}
+        self.status = {}
+        self.features = None
+        self.version = 0
+        self.last_ingest = None
+        self.unreported = 0
+        self.refresh()
+        if self.features is None:
+            raise OSError(f"no review source could be loaded: {self.errors()}")
+        self.stopped = threading.Event()
+        self.wake = threading.Event()
+        if refresh_interval:
+            threading.Thread(target=self.run, name='review-refresh', daemon=True).start()
+
+    def errors(self):
+        return {source: s['error'] for source, s in self.status.items() if s['error']}
+
+    def missing_sources(self):
+        # Failed sources that never loaded, so none of their rows are shown
+        return [source for source in self.errors() if self.frames.get(source) is None]
+
+    def refresh(self):
+        rules_mtime = source_mtime(DOMAIN_RULES_FILE)
+        if rules_mtime != self.rules_mtime:
+            # Domains are assigned while reading, so every source is read again
+            self.rules, self.rules_mtime = load_domain_rules(), rules_mtime
+            self.fingerprints = {}
+        results = read_sources(self.sources, self.rules, self.fetch, self.workers, self.fingerprints)
+        changed = False
+        now = pd.Timestamp.now()
+        for source, frame, fingerprint, error, seconds in results:
+            if error is None and fingerprint != self.fingerprints.get(source):
+                self.frames[source], self.fingerprints[source] = frame, fingerprint
+                changed = True
+            previous = self.status.get(source, {})
+            self.status[source] = {
+                'rows': len(self.frames[source]) if self.frames.get(source) is not None else 0,
+                'seconds': round(seconds, 4),
+                'error': error,
+                'loaded_at': now if error is None else previous.get('loaded_at'),
+            }
+        if not changed:
+            return False
+
+        merged = merge_sources(self.frames.get(source) for source in self.sources)
+        if merged is None:
+            return False
+        df, skipped = merged
+        features = build_features(df)
+        with self.lock:
+            if self.features is not None:
+                added = max(len(df) - len(self.features['frame']), 0)
+                self.unreported += added
+                self.last_ingest = (added, skipped, now)
+            self.features = features
+            self.version += 1
+        return True
+
+    def run(self):
+        while True:
+            self.wake.wait(self.refresh_interval)
+            self.wake.clear()
+            if self.stopped.is_set():
+                return
+            try:
+                self.refresh()
+            except Exception:  # keep serving the last good features; retry next interval
+                pass
+
+    def stop(self):
+        self.stopped.set()
+        self.wake.set()
+
+    def status_frame(self):
+        return pd.DataFrame([
+            {'Source': source, 'Rows': s['rows'], 'Seconds': s['seconds'], 'Loaded': s['loaded_at'], 'Error': s['error']}
+            for source, s in self.status.items()
+        ])
+
+    def poll(self):
+        # Never blocks on a refresh: reports rows swapped in since the last call
+        if source_mtime(DOMAIN_RULES_FILE) != self.rules_mtime:
+            if self.refresh_interval:
+                self.wake.set()
+            else:
+                self.refresh()
+        with self.lock:
+            added, self.unreported = self.unreported, 0
+            return added
+
+
+# --- SHARED SNAPSHOT ---
+# For several server processes on one host: one publisher writes the enriched
+# dataset and its indexes as Arrow IPC files under a snapshot directory, and the
+# other processes memory-map the newest one. Mapped pages live in the OS page
+# cache, so every process (and every session in it) reads the same memory.
+SNAPSHOT_CURRENT = 'CURRENT'
+SNAPSHOT_LOCK = 'publisher.lock'
+SNAPSHOT_KEEP = 2
+# Minimum seconds between republishing while new reviews keep arriving
+SNAPSHOT_MIN_INTERVAL = 30
+TEXT_DTYPES = {pa.string(): REVIEW_DTYPE, pa.large_string(): REVIEW_DTYPE}
+_PUBLISHER_LOCKS = {}
+
+
+def publish_snapshot(features, snapshot_dir, meta=None):
+    name = f"snapshot-{time.time_ns()}"
+    target = os.path.join(snapshot_dir, name)
+    os.makedirs(target)
+    frame = features['frame']
+    index = features['index'].merged(frame['Review'])
+    tables = {
+        'frame': pa.Table.from_pandas(frame, preserve_index=False),
+        'chronological': pa.Table.from_pandas(features['chronological'], preserve_index=False),
+        'order': pa.table({'Chrono Order': features['chrono_order'], **features['orders']}),
+        'bitmaps': features['bitmaps'].to_table(),
+        'terms': pa.table({'Term': pa.array(index.vocab, pa.string()), 'Start': index.offsets[:-1]}),
+        'postings': pa.table({'Row': index.rows, 'TF': index.tf}),
+        'hits': pa.Table.from_pandas(features['hits'], preserve_index=False),
+        'rollup': pa.Table.from_pandas(features['rollup'], preserve_index=False),
+        'sentiment_rollup': pa.Table.from_pandas(features['sentiment_rollup'], preserve_index=False),
+        'pillar_rollup': pa.Table.from_pandas(features['pillar_rollup'], preserve_index=False),
+    }
+    for part, table in tables.items():
+        if not write_ipc(table, os.path.join(target, f"{part}.arrow")):
+            raise OSError(f"could not write snapshot part {part!r} to {target}")
+    with open(os.path.join(target, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump({'rows': len(frame), **(meta or {})}, f)
+
+    # Switch readers over atomically, then drop all but the newest snapshots.
+    # Processes still mapping a dropped one keep their pages until they re-attach.
+    current = os.path.join(snapshot_dir, SNAPSHOT_CURRENT)
+    with open(f"{current}.tmp", 'w', encoding='utf-8') as f:
+        f.write(name)
+    os.replace(f"{current}.tmp", current)
+    old = sorted(e for e in os.listdir(snapshot_dir) if e.startswith('snapshot-'))[:-SNAPSHOT_KEEP]
+    for entry in old:
+        shutil.rmtree(os.path.join(snapshot_dir, entry), ignore_errors=True)
+    return name
+
+
+def current_snapshot(snapshot_dir):
+    try:
+        with open(os.path.join(snapshot_dir, SNAPSHOT_CURRENT), encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def column_array(table, name):
+    # Zero-copy NumPy view of a single-chunk, null-free column
+    return table.column(name).combine_chunks().to_numpy(zero_copy_only=False)
+
+
+def attach_snapshot(snapshot_dir, name):
+    path = os.path.join(snapshot_dir, name)
+
+    def part(part_name):
+        return read_ipc(os.path.join(path, f"{part_name}.arrow"))
+
+    def frame_part(part_name):
+        # pandas metadata restores Int8 / categorical dtypes; text stays in the mapped buffers
+        return part(part_name).to_pandas(split_blocks=True, types_mapper=TEXT_DTYPES.get)
+
+    frame = frame_part('frame')
+    terms, postings = part('terms'), part('postings')
+    offsets = np.append(column_array(terms, 'Start'), postings.num_rows)
+    index = ReviewIndex.from_postings(
+        frame['Review'], column_array(terms, 'Term').astype(object),
+        column_array(postings, 'Row'), column_array(postings, 'TF'), offsets,
+    )
+    with open(os.path.join(path, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+    orders = part('order')
+    features = {
+        'frame': frame,
+        'chronological': frame_part('chronological'),
+        'chrono_order': column_array(orders, 'Chrono Order'),
+        'orders': {name: column_array(orders, name) for name in FEED_SORTS},
+        'bitmaps': RowBitmaps.from_table(part('bitmaps'), len(frame)),
+        'index': SegmentedIndex([index]),
+        'hits': frame_part('hits'),
+        'rollup': frame_part('rollup'),
+        'sentiment_rollup': frame_part('sentiment_rollup'),
+        'pillar_rollup': frame_part('pillar_rollup'),
+    }
+    return features, manifest
+
+
+def acquire_publisher_lock(snapshot_dir):
+    # One publisher per snapshot directory, across all processes on the host. The
+    # lock is held for the life of the process and released by the OS if it dies.
+    if snapshot_dir in _PUBLISHER_LOCKS:
+        return True
+    if fcntl is None:
+        return False
+    f = open(os.path.join(snapshot_dir, SNAPSHOT_LOCK), 'a')
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return False
+    _PUBLISHER_LOCKS[snapshot_dir] = f
+    return True
+
+
+class SharedDataset:
+    # Drop-in for LiveDataset when several processes serve the dashboard. The
+    # process holding the publisher lock runs the LiveDataset and republishes it
+    # when it changes; every other process attaches to the newest snapshot and
+    # only falls back to a private copy until the first one has been published.
+
+    def __init__(self, snapshot_dir, csv_path=DATA_FILE, inbox_dir=INBOX_DIR, sources=None):
+        os.makedirs(snapshot_dir, exist_ok=True)
+        self.snapshot_dir = snapshot_dir
+        self.csv_path = csv_path
+        self.inbox_dir = inbox_dir
+        self.sources = sources
+        self.lock = threading.Lock()
+        self.live = None
+        self.attached = None
+        self.published_version = None
+        self.published_at = 0.0
+        self.publishing = None
+        self.source_errors = {}
+        self.source_missing = []
+        self.features = None
+        self.version = 0
+        self.last_ingest = None
+        self.poll()
+
+    def open_live(self):
+        if self.sources:
+            return MultiSourceDataset(self.sources)
+        return LiveDataset(self.csv_path, self.inbox_dir)
+
+    @property
+    def publisher(self):
+        return self.snapshot_dir in _PUBLISHER_LOCKS
+
+    def errors(self):
+        # Failed sources, from the live dataset here or from the publisher's manifest
+        if isinstance(self.live, MultiSourceDataset):
+            return self.live.errors()
+        return self.source_errors
+
+    def missing_sources(self):
+        if isinstance(self.live, MultiSourceDataset):
+            return self.live.missing_sources()
+        return self.source_missing
+
+    def status_frame(self):
+        # Per-source status, only known to a process that reads the sources itself
+        return self.live.status_frame() if isinstance(self.live, MultiSourceDataset) else None
+
+    def serve(self, features):
+        if features is not self.features:
+            self.features = features
+            self.version += 1
+
+    def publish(self, features, version, meta):
+        # Runs on its own thread: writing the snapshot can take seconds, and reruns
+        # must not wait for it on self.lock
+        try:
+            publish_snapshot(features, self.snapshot_dir, meta)
+            self.published_version = version
+        except OSError:
+            pass  # unwritable snapshot dir: other processes keep their copy
+        finally:
+            self.publishing = None
+
+    def start_publish(self):
+        meta = {
+            'dataset_version': self.live.version,
+            'source_errors': self.errors(),
+            'missing_sources': self.missing_sources(),
+        }
+        if self.live.last_ingest:
+            added, skipped, at = self.live.last_ingest
+            meta['last_ingest'] = [added, skipped, at.isoformat()]
+        self.published_at = time.monotonic()
+        self.publishing = threading.Thread(
+            target=self.publish, args=(self.live.features, self.live.version, meta), name='snapshot-publish', daemon=True
+        )
+        self.publishing.start()
+
+    def poll(self):
+        with self.lock:
+            if acquire_publisher_lock(self.snapshot_dir):
+                if self.live is None:
+                    self.live = self.open_live()
+                added = self.live.poll()
+                due = time.monotonic() - self.published_at >= SNAPSHOT_MIN_INTERVAL
+                if self.live.version != self.published_version and due and self.publishing is None:
+                    self.start_publish()
+                self.last_ingest = self.live.last_ingest
+                self.serve(self.live.features)
+                return added
+
+            name = current_snapshot(self.snapshot_dir)
+            if name is None:
+                if self.live is None:
+                    self.live = self.open_live()
+                added = self.live.poll()
+                self.serve(self.live.features)
+                return added
+            if name != self.attached:
+                features, manifest = attach_snapshot(self.snapshot_dir, name)
+                previous = self.features
+                self.live, self.attached = None, name
+                self.source_errors = manifest.get('source_errors', {})
+                self.source_missing = manifest.get('missing_sources', [])
+                self.serve(features)
+                if manifest.get('last_ingest'):
+                    added, skipped, at = manifest['last_ingest']
+                    self.last_ingest = (added, skipped, pd.Timestamp(at))
+                return max(len(features['frame']) - len(previous['frame']), 0) if previous is not None else 0
+            return 0
+
+
+# --- FEED RENDERING ---
+NO_REVIEW_HTML = '<div class="no-review">No written review provided.</div>'
+
+
+def escaped(values):
+    # Review text and names come from user exports; never let them through as markup
+    return values.astype(str).map(html.escape)
+
+
+def render_feed_cards(page_df, similar=None):
+    # One HTML string for the whole page, built column-wise instead of per row
+    d_str = page_df['Date'].dt.strftime('%B %d, %Y').fillna('')
+    stars = pd.Series('★', index=page_df.index).str.repeat(
+        page_df['Rating'].fillna(0).round().astype(int).tolist()
+    )
+    rev_html = escaped(page_df['Review'].fillna('').str.strip()).radd('<div>"').add('"</div>').where(~page_df['Is Placeholder'], NO_REVIEW_HTML)
+    if similar is not None:
+        # Collapsed feed: `similar` counts the other reviews in the view each card stands for
+        others = pd.Series(np.asarray(similar, dtype=np.int64), index=page_df.index)
+        noun = pd.Series(np.where(others == 1, ' similar review', ' similar reviews'), index=page_df.index)
+        rev_html = rev_html + ('<div class="similar-note">+ ' + others.astype(str) + noun + '</div>').where(others > 0, '')
+
+    cards = (
+        '<div class="review-card">'
+        '<div style="display: flex; justify-content: space-between; align-items: center;">'
+        '<div><span style="font-size: 0.75rem; font-weight: 600; color: #64748b; text-transform: uppercase; letter-spacing: 0.5px;">'
+        + escaped(page_df['Domain'])
+        + '</span></div><span style="color:#FBBF24; font-size:1.1rem;">' + stars + '</span></div>'
+        '<div style="font-weight:700; font-size:1.1rem; margin: 4px 0 2px 0;">' + escaped(page_df['Client Name']) + '</div>'
+        '<div style="font-size:0.9rem; color:#64748b; margin: 0 0 12px 0;">📅 ' + d_str + ' • ' + escaped(page_df['Category']) + '</div>'
+        + rev_html
+        + '</div>'
+    )
+    return "\n".join(cards.tolist())
+
+
+# --- QUERY CACHE ---
+# Viewers repeat the same filter / search combinations (all domains, "communication"),
+# so feed results are shared across sessions: the row positions of a query and the
+# rendered HTML of its pages, in one LRU bounded by bytes.
+QUERY_CACHE_BYTES = 64 * 2**20
+
+
+def normalize_query(query):
+    # Same key for queries that differ only in case, spacing or term order
+    parts = []
+    for phrase, word in QUERY_RE.findall(query.lower()):
+        tokens = TOKEN_RE.findall(phrase or word)
+        if tokens:
+            parts.append(f'"{" ".join(tokens)}"' if phrase or len(tokens) > 1 else tokens[0])
+    return ' '.join(sorted(parts))
+
+
+def entry_size(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, tuple):
+        return sys.getsizeof(value) + sum(entry_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class QueryCache:
+    def __init__(self, max_bytes=QUERY_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.data_version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def invalidate(self, data_version):
+        # Keys carry the data version too; dropping stale entries here frees their memory at once
+        with self.lock:
+            if data_version != self.data_version:
+                self.entries.clear()
+                self.bytes = 0
+                self.data_version = data_version
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = entry_size(value)
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False  # shared by every session
+        if size > self.max_bytes:
+            return value
+        with self.lock:
+            if key in self.entries:
+                self.bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+        return value
+
+    def get_or_compute(self, key, compute):
+        # (value, hit); concurrent misses on one key may both compute, which is harmless
+        value = self.get(key)
+        if value is not None:
+            return value, True
+        return self.put(key, compute()), False
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'bytes': self.bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+# --- EXPORT ---
+EXPORT_COLUMNS = ['Category', 'Date', 'Client Name', 'Rating', 'Review']
+EXPORT_SCHEMA = pa.schema([
+    ('Category', pa.string()),
+    ('Date', pa.date32()),
+    ('Client Name', pa.string()),
+    ('Rating', pa.float64()),
+    ('Review', pa.string()),
+])
+# label -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'CSV (gzip)': ('csv.gz', 'application/gzip'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'JSONL': ('jsonl', 'application/x-ndjson'),
+}
+EXPORT_CHUNK_ROWS = 100_000
+
+
+class _ByteSink(io.RawIOBase):
+    # Write-only file object whose contents are drained after every row group
+    def __init__(self):
+        self.parts = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def export_format_for(file_path):
+    for label, (ext, _) in sorted(EXPORT_FORMATS.items(), key=lambda item: -len(item[1][0])):
+        if file_path.endswith('.' + ext):
+            return label
+    return 'CSV'
+
+
+def export_chunks(frame, fmt='CSV', rows=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    # Yields the export as byte chunks, converting chunk_rows rows at a time, so
+    # peak memory is bounded by the chunk size rather than the export size.
+    # `rows` selects row positions of `frame` without materializing the subset.
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31) if fmt == 'CSV (gzip)' else None
+    sink = writer = None
+    if fmt == 'Parquet':
+        sink = _ByteSink()
+        writer = pq.ParquetWriter(sink, EXPORT_SCHEMA)
+
+    n_rows = len(frame) if rows is None else len(rows)
+    for start in range(0, max(n_rows, 1), chunk_rows):
+        span = slice(start, start + chunk_rows)
+        chunk = (frame.iloc[span] if rows is None else frame.iloc[rows[span]])[EXPORT_COLUMNS]
+        chunk = chunk.assign(Rating=chunk['Rating'].astype('float64'))
+        if fmt == 'Parquet':
+            writer.write_table(pa.Table.from_pandas(chunk, schema=EXPORT_SCHEMA, preserve_index=False))
+            yield sink.drain()
+            continue
+
+        chunk = chunk.assign(Date=chunk['Date'].dt.strftime('%Y-%m-%d'))
+        if fmt == 'JSONL':
+            yield chunk.to_json(orient='records', lines=True, force_ascii=False).encode('utf-8') if len(chunk) else b''
+            continue
+        data = chunk.to_csv(index=False, header=start == 0).encode('utf-8')
+        yield gz.compress(data) if gz else data
+
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
+    if gz is not None:
+        yield gz.flush()
+
+
+def write_export(frame, file_path, fmt=None, rows=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    fmt = fmt or export_format_for(file_path)
+    with open(file_path, 'wb') as f:
+        for data in export_chunks(frame, fmt, rows, chunk_rows):
+            f.write(data)
+    return file_path
+
+
+# --- REPORTING ---
+def selection_mask(frame, domains=None, categories=None):
+    # Boolean row mask for a Domain / Category selection; None means "all"
+    mask = np.ones(len(frame), dtype=bool)
+    if domains is not None:
+        mask &= frame['Domain'].isin(domains).to_numpy()
+    if categories is not None:
+        mask &= frame['Category'].isin(categories).to_numpy()
+    return mask
+
+
+def build_report(features, domains=None, categories=None):
+    frame = features['frame']
+    mask = features['bitmaps'].select(domains, categories)
+    headline = headline_metrics(features['rollup'], domains, categories)
+    rows = frame[mask]
+    chrono = features['chronological'][mask[features['chrono_order']]]
+    streaks = five_star_streaks(chrono)
+    ratings = rows['Rating']
+    dates = rows['Date'].dropna()
+    return {
+        'reviews': int(len(rows)),
+        'first_date': dates.min().strftime('%Y-%m-%d') if not dates.empty else None,
+        'last_date': dates.max().strftime('%Y-%m-%d') if not dates.empty else None,
+        'composite_rating': round(float(ratings.mean()), 2) if ratings.notna().any() else None,
+        'five_star': int((ratings == 5.0).sum()),
+        'max_streak': int(streaks['Length'].max()) if not streaks.empty else 0,
+        'current_streak': int(rolling_streak(chrono['Rating'])[-1]) if not chrono.empty else 0,
+        'domains': {str(k): int(v) for k, v in rows['Domain'].value_counts().items() if v},
+        'pillars': count_hits(features['hits'], PILLARS, mask).to_dict(),
+        'keywords': count_hits(features['hits'], KEYWORDS, mask).to_dict(),
+        'mean_sentiment': round(float(rows['Sentiment'].mean()), 3) if rows['Sentiment'].notna().any() else None,
+        **{key: headline[key] for key in ['risk_rate', 'risk_low', 'risk_high']},
+        'sla': {
+            str(row['Group']): round(float(row['SLA Score']), 4)
+            for _, row in sla_summary(rolling_sla(features['rollup'], 'Domain', domains, categories)).iterrows()
+        },
+    }
+
+
+def memory_report(frame):
+    # Bytes held per column (strings included), largest first
+    usage = frame.memory_usage(index=False, deep=True)
+    report = pd.DataFrame({
+        'Column': usage.index,
+        'Dtype': frame.dtypes.astype(str).to_numpy(),
+        'Bytes': usage.to_numpy(),
+    }).sort_values('Bytes', ascending=False, ignore_index=True)
+    report['Bytes/Row'] = (report['Bytes'] / max(len(frame), 1)).round(1)
+    return report
+
+
+def report_rows(report):
+    # Flatten a report into (Section, Metric, Value) rows for CSV output
+    rows = []
+    for key, value in report.items():
+        if isinstance(value, dict):
+            rows.extend((key, name, v) for name, v in value.items())
+        else:
+            rows.append(('summary', key, value))
+    return pd.DataFrame(rows, columns=['Section', 'Metric', 'Value'])
+
+
+# --- CLI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute the dashboard's review metrics for an input file.")
+    parser.add_argument('input', nargs='*', default=[DATA_FILE],
+                        help="review CSV (default: %(default)s); several files, directories of CSV/JSONL "
+                             "exports and http(s) URLs are read concurrently and merged")
+    parser.add_argument('--format', choices=['json', 'csv'], default='json')
+    parser.add_argument('--domain', action='append', help="restrict to a Domain (repeatable)")
+    parser.add_argument('--category', action='append', help="restrict to a Category (repeatable)")
+    parser.add_argument('--rules', default=DOMAIN_RULES_FILE, help="domain rules CSV (default: %(default)s)")
+    parser.add_argument('--output', '-o', help="write to this file instead of stdout")
+    parser.add_argument('--timings', action='store_true', help="include per-stage timings in the report")
+    parser.add_argument('--publish', metavar='DIR',
+                        help="also publish the enriched dataset as a shared snapshot under DIR")
+    parser.add_argument('--memory', action='store_true', help="include per-column memory use of the loaded table")
+    parser.add_argument('--export', metavar='FILE',
+                        help="also write the selected reviews to FILE (.csv, .csv.gz, .parquet or .jsonl)")
+    args = parser.parse_args(argv)
+
+    for source in args.input:
+        if not is_url(source) and not os.path.exists(source):
+            parser.error(f"input file not found: {source}")
+
+    timings = {}
+    start = time.perf_counter()
+    rules = load_domain_rules(args.rules)
+    if len(args.input) == 1 and os.path.isfile(args.input[0]):
+        df = load_data(args.input[0], rules)
+    else:
+        results = read_sources(args.input, rules)
+        errors = [f"{source}: {error}" for source, _, _, error, _ in results if error]
+        if errors:
+            parser.error("could not load " + "; ".join(errors))
+        merged = merge_sources(frame for _, frame, _, _, _ in results)
+        if merged is None:
+            parser.error("no reviews found in " + ", ".join(args.input))
+        df = merged[0]
+    timings['load'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    features = build_features(df)
+    timings['enrich'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    report = build_report(features, args.domain, args.category)
+    timings['report'] = time.perf_counter() - start
+    if args.export:
+        start = time.perf_counter()
+        frame = features['frame']
+        rows = np.flatnonzero(selection_mask(frame, args.domain, args.category))
+        write_export(frame, args.export, rows=rows)
+        timings['export'] = time.perf_counter() - start
+    if args.publish:
+        os.makedirs(args.publish, exist_ok=True)
+        sources = [source if is_url(source) else os.path.abspath(source) for source in args.input]
+        report['snapshot'] = publish_snapshot(features, args.publish, {'sources': sources})
+    if args.memory:
+        report['memory'] = dict(zip(*memory_report(features['frame'])[['Column', 'Bytes']].to_numpy().T.tolist()))
+    if args.timings:
+        report['timings'] = {stage: round(seconds, 4) for stage, seconds in timings.items()}
+
+    if args.format == 'json':
+        text = json.dumps(report, indent=2) + '\n'
+    else:
+        text = report_rows(report).to_csv(index=False)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
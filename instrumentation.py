@@ -0,0 +1,173 @@
+"""Lightweight per-rerun instrumentation for the dashboard.
+
+A RerunTrace collects timing spans, row counts and payload sizes for one script
+run. Traces are folded into a process-wide MetricsRegistry, which also counts
+cache hits and misses and can be exported as JSON or Prometheus text. Recording
+is a perf_counter() pair and a few dict updates per stage, so it stays on in
+production; only the debug panel that displays it is optional.
+"""
+import functools
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import pandas as pd
+
+
+class RerunTrace:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+        self.rows = defaultdict(int)
+        self.payloads = defaultdict(int)
+
+    @contextmanager
+    def span(self, name, rows=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append((name, time.perf_counter() - start))
+            if rows is not None:
+                self.rows[name] += int(rows)
+
+    def add_rows(self, name, n):
+        self.rows[name] += int(n)
+
+    def add_payload(self, name, payload):
+        # Accepts the payload itself (str / bytes) or an already known size
+        if isinstance(payload, str):
+            payload = len(payload.encode('utf-8'))
+        elif isinstance(payload, (bytes, bytearray)):
+            payload = len(payload)
+        self.payloads[name] += int(payload)
+
+    @property
+    def total_seconds(self):
+        return time.perf_counter() - self.started
+
+    def to_frame(self):
+        spans = pd.DataFrame(self.spans, columns=['Stage', 'Seconds'])
+        spans = spans.groupby('Stage', sort=False)['Seconds'].sum().reset_index()
+        spans['ms'] = (spans.pop('Seconds') * 1000).round(2)
+        spans['Rows'] = spans['Stage'].map(self.rows).astype('Int64')
+        return spans
+
+
+class MetricsRegistry:
+    # Cumulative metrics for this server process, shared by all sessions
+
+    def __init__(self, prefix='dashboard'):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.reruns = 0
+        self.rerun_seconds = 0.0
+        self.stage_seconds = defaultdict(float)
+        self.stage_count = defaultdict(int)
+        self.rows = defaultdict(int)
+        self.payload_bytes = defaultdict(int)
+        self.cache = defaultdict(int)
+
+    def record(self, trace):
+        with self.lock:
+            self.reruns += 1
+            self.rerun_seconds += trace.total_seconds
+            for name, seconds in trace.spans:
+                self.stage_seconds[name] += seconds
+                self.stage_count[name] += 1
+            for name, n in trace.rows.items():
+                self.rows[name] += n
+            for name, n in trace.payloads.items():
+                self.payload_bytes[name] += n
+
+    def cache_event(self, name, hit):
+        with self.lock:
+            self.cache[(name, 'hit' if hit else 'miss')] += 1
+
+    def cache_stats(self):
+        names = sorted({name for name, _ in self.cache})
+        return {
+            name: {'hits': self.cache[(name, 'hit')], 'misses': self.cache[(name, 'miss')]}
+            for name in names
+        }
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                'reruns': self.reruns,
+                'rerun_seconds': round(self.rerun_seconds, 6),
+                'stages': {
+                    name: {'seconds': round(seconds, 6), 'count': self.stage_count[name], 'rows': self.rows.get(name, 0)}
+                    for name, seconds in self.stage_seconds.items()
+                },
+                'payload_bytes': dict(self.payload_bytes),
+                'cache': self.cache_stats(),
+            }
+
+    def to_prometheus(self):
+        p = self.prefix
+        with self.lock:
+            lines = [
+                f"# HELP {p}_reruns_total Script reruns served by this process.",
+                f"# TYPE {p}_reruns_total counter",
+                f"{p}_reruns_total {self.reruns}",
+                f"# HELP {p}_rerun_seconds Wall time per script rerun.",
+                f"# TYPE {p}_rerun_seconds summary",
+                f"{p}_rerun_seconds_sum {self.rerun_seconds:.6f}",
+                f"{p}_rerun_seconds_count {self.reruns}",
+                f"# HELP {p}_stage_seconds Wall time per dashboard stage.",
+                f"# TYPE {p}_stage_seconds summary",
+            ]
+            for name, seconds in self.stage_seconds.items():
+                lines.append(f'{p}_stage_seconds_sum{{stage="{name}"}} {seconds:.6f}')
+                lines.append(f'{p}_stage_seconds_count{{stage="{name}"}} {self.stage_count[name]}')
+            lines += [
+                f"# HELP {p}_rows_processed_total Rows handled per stage.",
+                f"# TYPE {p}_rows_processed_total counter",
+            ]
+            lines += [f'{p}_rows_processed_total{{stage="{name}"}} {n}' for name, n in self.rows.items()]
+            lines += [
+                f"# HELP {p}_payload_bytes_total Bytes sent to the browser per element.",
+                f"# TYPE {p}_payload_bytes_total counter",
+            ]
+            lines += [f'{p}_payload_bytes_total{{element="{name}"}} {n}' for name, n in self.payload_bytes.items()]
+            lines += [
+                f"# HELP {p}_cache_requests_total Cached function calls by result.",
+                f"# TYPE {p}_cache_requests_total counter",
+            ]
+            lines += [
+                f'{p}_cache_requests_total{{cache="{name}",result="{result}"}} {n}'
+                for (name, result), n in sorted(self.cache.items())
+            ]
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def tracked_cache(cache_decorator, name=None, registry=REGISTRY):
+    # Wrap a Streamlit cache decorator so every call is counted as a hit or a miss:
+    # the inner function only runs on a miss, so a call that didn't reach it was a hit.
+    def decorate(fn):
+        cache_name = name or fn.__name__
+        local = threading.local()
+
+        @functools.wraps(fn)
+        def on_miss(*args, **kwargs):
+            local.missed = True
+            return fn(*args, **kwargs)
+
+        cached = cache_decorator(on_miss)
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            local.missed = False
+            result = cached(*args, **kwargs)
+            registry.cache_event(cache_name, hit=not local.missed)
+            return result
+
+        call.clear = getattr(cached, 'clear', None)
+        return call
+
+    return decorate
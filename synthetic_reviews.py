@@ -0,0 +1,148 @@
+"""Synthetic review generator matching the taskrabbit_reviews_clean.csv schema.
+
+Produces Category, Date, Client Name, Rating, Review rows with the same shape as
+the verified sample: a heavy 5-star skew, more recent years weighted higher,
+roughly a quarter of reviews left blank, and review text assembled from phrases
+that exercise the search box and keyword pillars.
+
+    python synthetic_reviews.py --rows 1000000 -o synthetic_1m.csv
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Weights follow the category mix of the verified sample
+CATEGORIES = {
+    'Packing & Unpacking': 50,
+    'Photography': 40,
+    'Event Staffing': 34,
+    'Computer Help': 18,
+    'Organization': 14,
+    'Errands': 11,
+    'Personal Assistant': 9,
+    'Furniture Assembly': 8,
+    'Arts / Crafts': 4,
+    'Office Administration': 2,
+}
+RATINGS = {5.0: 0.95, 4.0: 0.025, 2.0: 0.01, 1.0: 0.015}
+# Relative review volume per year; the sample grows sharply after 2021
+YEARS = {2018: 2, 2019: 5, 2020: 9, 2021: 6, 2022: 34, 2023: 22, 2024: 35, 2025: 77}
+PLACEHOLDER_SHARE = 0.25
+
+FIRST_NAMES = [
+    'Aaron', 'Alice', 'Amanda', 'Benjamin', 'Carine', 'Carl', 'Chris', 'Dana', 'Eri', 'Emily',
+    'Holly', 'Jeffrey', 'Kara', 'Kathy', 'Lena', 'Michael', 'Miriam', 'Nina', 'Omar', 'Pat',
+    'Paula', 'Priya', 'Rosa', 'Scott', 'Shanti', 'Todd', 'Umbi', 'Victor', 'Yangfan', 'Zhu',
+]
+OPENERS = [
+    'Lauren was great.', 'Lauren is very professional and does a great job.', 'Lauren was fantastic!',
+    'She did an amazing job.', 'Lauren is a pleasure to work with.', 'Really wonderful work.',
+    'Lauren went above and beyond.', 'Saved the day!', 'Lauren is smart, pleasant and tenacious.',
+]
+TRAITS = [
+    'Excellent communication and great attention to detail.', 'She worked quickly and efficiently.',
+    'Very friendly and easy to work with.', 'Calm and patient the whole time.',
+    'Super communicative and kind.', 'Fast, efficient, and stress-free.',
+    'She was on time and very helpful.', 'Great conversation and a nice person.',
+    'Took beautiful photos of the event.', 'Packed everything carefully and organized the kitchen.',
+]
+CLOSERS = [
+    'I highly recommend!', 'Highly recommended.', 'Would absolutely hire her again.',
+    "Can't recommend her enough.", 'Perfect job.', 'Much appreciated.', '',
+]
+TASK_NOUNS = [
+    'kitchen', 'garage', 'closet', 'pantry', 'office', 'bookshelf', 'wardrobe', 'desk', 'printer',
+    'laptop', 'router', 'spreadsheet', 'headshots', 'wedding', 'birthday party', 'fundraiser',
+    'gala', 'holiday tree', 'gift wrapping', 'moving boxes', 'storage unit', 'filing cabinet',
+    'dinner party', 'product shoot', 'conference', 'bbq', 'donation run', 'pharmacy pickup',
+    'grocery run', 'craft table', 'dresser', 'crib', 'tv mount', 'photo album', 'inventory',
+]
+NEGATIVE = [
+    'Arrived late and the job took longer than expected.',
+    'Communication could have been better.',
+    'Not what we asked for.',
+]
+PLACEHOLDERS = ['No text provided']
+# Worst case for near-duplicate clustering: one template with a few words swapped,
+# so nearly every review shares LSH buckets with thousands of others
+TEMPLATE = 'she was very helpful and careful with all our things during the move'
+TEMPLATE_SWAPS = 3
+
+
+def pick(rng, options, n, weights=None):
+    options = np.asarray(list(options), dtype=object)
+    if weights is not None:
+        weights = np.asarray(list(weights), dtype=np.float64)
+        weights = weights / weights.sum()
+    return options[rng.choice(len(options), size=n, p=weights)]
+
+
+def generate_reviews(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+
+    years = pick(rng, YEARS, n_rows, YEARS.values()).astype(np.int64)
+    day_of_year = rng.integers(0, 365, n_rows)
+    dates = (years - 1970).astype('datetime64[Y]').astype('datetime64[D]') + day_of_year
+
+    names = pick(rng, FIRST_NAMES, n_rows) + ' ' + pick(rng, list('ABCDEFGHJKLMNOPRSTVWZ'), n_rows) + '.'
+    ratings = pick(rng, RATINGS, n_rows, RATINGS.values()).astype(np.float64)
+
+    text = pick(rng, OPENERS, n_rows) + ' ' + pick(rng, TRAITS, n_rows) + ' ' + pick(rng, CLOSERS, n_rows)
+    detail = rng.random(n_rows) < 0.5
+    text[detail] = text[detail] + ' Helped with the ' + pick(rng, TASK_NOUNS, int(detail.sum())) + '.'
+    low = ratings < 4.0
+    text[low] = pick(rng, NEGATIVE, int(low.sum()))
+    blank = rng.random(n_rows) < PLACEHOLDER_SHARE
+    text[blank] = pick(rng, PLACEHOLDERS, int(blank.sum()))
+
+    df = pd.DataFrame({
+        'Category': pick(rng, CATEGORIES, n_rows, CATEGORIES.values()),
+        'Date': dates,
+        'Client Name': names,
+        'Rating': ratings,
+        'Review': pd.Series(text).str.strip(),
+    })
+    # Newest first, like the platform export
+    return df.sort_values('Date', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def templated_reviews(n_rows, seed=0, swaps=TEMPLATE_SWAPS):
+    rng = np.random.default_rng(seed)
+    words = np.tile(np.array(TEMPLATE.split(), dtype=object), (n_rows, 1))
+    vocab = np.array([f'word{i}' for i in range(300)], dtype=object)
+    # `swaps` distinct positions per row: the first columns of a random permutation
+    slots = np.argsort(rng.random(words.shape), axis=1)[:, :swaps]
+    words[np.arange(n_rows)[:, None], slots] = vocab[rng.integers(0, len(vocab), (n_rows, swaps))]
+    return pd.Series([' '.join(row) for row in words])
+
+
+def write_reviews(file_path, n_rows, seed=0, chunk_rows=1_000_000):
+    # Written in chunks so 10M-row files never sit in memory at once. Each chunk is
+    # sorted on its own, so the file is newest-first within chunks only.
+    written = 0
+    chunk = 0
+    while written < n_rows:
+        rows = min(chunk_rows, n_rows - written)
+        df = generate_reviews(rows, seed=seed + chunk)
+        df['Date'] = df['Date'].dt.strftime('%Y-%m-%d')
+        df.to_csv(file_path, mode='w' if chunk == 0 else 'a', header=chunk == 0, index=False)
+        written += rows
+        chunk += 1
+    return file_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic review CSV.")
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', '-o', default='synthetic_reviews.csv')
+    args = parser.parse_args(argv)
+    write_reviews(args.output, args.rows, args.seed)
+    print(f"wrote {args.rows:,} rows to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
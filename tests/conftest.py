@@ -0,0 +1,38 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root, next to app.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine  # noqa: E402
+from synthetic_reviews import generate_reviews  # noqa: E402
+
+N_ROWS = 3_000
+BATCH_ROWS = 250
+
+
+@pytest.fixture(scope='session', params=['newest_first', 'oldest_first'])
+def reviews(request):
+    # Newest first (as exported) sends every later batch through the re-sort path;
+    # oldest first takes the common append-only path
+    df = generate_reviews(N_ROWS, seed=7)
+    if request.param == 'oldest_first':
+        df = df.iloc[::-1].reset_index(drop=True)
+    return engine.prepare_frame(df, engine.DEFAULT_DOMAIN_RULES)
+
+
+@pytest.fixture(scope='session')
+def full(reviews):
+    return engine.build_features(reviews, score_cache=None)
+
+
+@pytest.fixture(scope='session')
+def extended(reviews):
+    # The same rows, built from the first two thirds and then folded in batch by batch
+    split = N_ROWS * 2 // 3
+    features = engine.build_features(reviews.iloc[:split].reset_index(drop=True), score_cache=None)
+    for start in range(split, N_ROWS, BATCH_ROWS):
+        features = engine.extend_features(features, reviews.iloc[start:start + BATCH_ROWS].reset_index(drop=True))
+    return features
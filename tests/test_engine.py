@@ -0,0 +1,412 @@
+import gzip
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+import engine
+from synthetic_reviews import templated_reviews
+
+SELECTIONS = [
+    (None, None),
+    (['Logistics'], None),
+    (['Visual Media', 'Operations'], None),
+    (None, ['Photography', 'Errands']),
+]
+QUERIES = ['great', 'communicat', 'kitchen helpful', '"highly recommended"', 'Great   JOB', 'zzz']
+
+
+def plain(frame):
+    # Categories can be ordered differently after extend_features; compare values only
+    return frame.reset_index(drop=True).astype({
+        col: 'object' for col in frame.columns if isinstance(frame[col].dtype, pd.CategoricalDtype)
+    })
+
+
+# --- extend_features == build_features ---
+def test_extend_matches_build_orders(full, extended):
+    for name in engine.FEED_SORTS:
+        np.testing.assert_array_equal(extended['orders'][name], full['orders'][name], err_msg=name)
+
+
+@pytest.mark.parametrize('domains, categories', SELECTIONS)
+def test_extend_matches_build_bitmaps(full, extended, domains, categories):
+    np.testing.assert_array_equal(
+        extended['bitmaps'].select(domains, categories), full['bitmaps'].select(domains, categories)
+    )
+    np.testing.assert_array_equal(
+        full['bitmaps'].select(domains, categories), engine.selection_mask(full['frame'], domains, categories)
+    )
+
+
+def test_bitmap_values_match_frame(full, extended):
+    frame = full['frame']
+    for bitmaps in (full['bitmaps'], extended['bitmaps']):
+        assert bitmaps.values('Domain') == sorted(frame['Domain'].astype(str).unique())
+        for domains in (['Logistics'], ['Visual Media', 'Operations'], []):
+            expected = sorted(frame.loc[frame['Domain'].isin(domains), 'Category'].astype(str).unique())
+            assert bitmaps.values('Category', 'Domain', domains) == expected
+
+
+def test_extend_matches_build_chronology(full, extended):
+    np.testing.assert_array_equal(extended['chrono_order'], full['chrono_order'])
+    np.testing.assert_array_equal(extended['frame']['Review #'], full['frame']['Review #'])
+    assert_frame_equal(plain(extended['chronological']), plain(full['chronological']))
+
+
+@pytest.mark.parametrize('domains, categories', SELECTIONS)
+def test_extend_matches_build_report(full, extended, domains, categories):
+    assert engine.build_report(extended, domains, categories) == engine.build_report(full, domains, categories)
+
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_extend_matches_build_search(full, extended, query):
+    for rank in (False, True):
+        expected = full['index'].search(query, rank=rank)
+        found = extended['index'].search(query, rank=rank)
+        if not rank:
+            expected, found = np.sort(expected), np.sort(found)
+        np.testing.assert_array_equal(found, expected)
+
+
+@pytest.mark.parametrize('domains, categories', SELECTIONS)
+def test_extend_matches_build_score_charts(full, extended, domains, categories):
+    for by in ['Domain', 'Category']:
+        assert_frame_equal(
+            engine.score_distribution(extended['sentiment_rollup'], by, domains, categories),
+            engine.score_distribution(full['sentiment_rollup'], by, domains, categories),
+        )
+        assert_frame_equal(
+            engine.pillar_mix(extended['pillar_rollup'], by, domains, categories),
+            engine.pillar_mix(full['pillar_rollup'], by, domains, categories),
+        )
+
+
+def test_score_charts_match_rows(full):
+    frame = full['frame']
+    mask = full['bitmaps'].select(['Logistics'], None)
+    rows = frame[mask & frame['Sentiment'].notna().to_numpy()]
+    dist = engine.score_distribution(full['sentiment_rollup'], 'Category', ['Logistics'])
+    assert dist['Reviews'].sum() == len(rows)
+    means = rows.groupby(rows['Category'].astype(str))['Sentiment'].mean()
+    np.testing.assert_allclose(dist.groupby('Group')['Mean Sentiment'].first(), means.loc[sorted(means.index)], rtol=1e-6)
+    mix = engine.pillar_mix(full['pillar_rollup'], 'Category', ['Logistics'])
+    assert mix['Reviews'].sum() == (mask & frame['Top Pillar'].notna().to_numpy()).sum()
+    assert engine.score_distribution(full['sentiment_rollup'], 'Domain', []).empty
+
+
+def test_extend_keeps_few_index_segments(extended):
+    assert len(extended['index'].segments) <= 4
+    merged = extended['index'].merged(extended['frame']['Review'])
+    assert extended['index'].n_terms == merged.n_terms
+
+
+# --- shared snapshots ---
+def test_snapshot_round_trip(extended, tmp_path):
+    name = engine.publish_snapshot(extended, str(tmp_path), {'source': 'test'})
+    attached, manifest = engine.attach_snapshot(str(tmp_path), name)
+
+    assert manifest == {'rows': len(extended['frame']), 'source': 'test'}
+    assert engine.current_snapshot(str(tmp_path)) == name
+    for part in ['frame', 'chronological', 'hits']:
+        assert_frame_equal(attached[part], extended[part].reset_index(drop=True), obj=part)
+    # Arrow hands the cubes' label columns back as a string dtype; the values must match
+    for part in ['rollup', 'sentiment_rollup', 'pillar_rollup']:
+        assert_frame_equal(attached[part], extended[part].reset_index(drop=True), check_dtype=False, obj=part)
+    np.testing.assert_array_equal(attached['chrono_order'], extended['chrono_order'])
+    for sort in engine.FEED_SORTS:
+        np.testing.assert_array_equal(attached['orders'][sort], extended['orders'][sort])
+    for domains, categories in SELECTIONS:
+        np.testing.assert_array_equal(
+            attached['bitmaps'].select(domains, categories), extended['bitmaps'].select(domains, categories)
+        )
+    for query in QUERIES:
+        np.testing.assert_array_equal(
+            attached['index'].search(query, rank=True), extended['index'].search(query, rank=True)
+        )
+    assert engine.build_report(attached) == engine.build_report(extended)
+
+
+def test_snapshot_keeps_newest(extended, tmp_path):
+    names = [engine.publish_snapshot(extended, str(tmp_path)) for _ in range(engine.SNAPSHOT_KEEP + 1)]
+    kept = sorted(e for e in tmp_path.iterdir() if e.name.startswith('snapshot-'))
+    assert [e.name for e in kept] == names[-engine.SNAPSHOT_KEEP:]
+
+
+# --- query parsing ---
+@pytest.fixture(scope='module')
+def small_index():
+    return engine.ReviewIndex(pd.Series([
+        "Great communication, highly recommended!",
+        "Packed the kitchen. Great, great job.",
+        "Highly professional; would recommend highly.",
+        "Communicative and quick",
+        None,
+    ], dtype=engine.REVIEW_DTYPE))
+
+
+@pytest.mark.parametrize('query, rows', [
+    ('great', [0, 1]),
+    ('GREAT', [0, 1]),
+    ('communicat', [0, 3]),
+    ('communicat*', [0, 3]),
+    ('great kitchen', [1]),
+    ('"highly recommended"', [0]),
+    ('"recommend highly"', [2]),
+    ('"great job"', [1]),
+    ('"job great"', []),
+    ('highly "great communication"', [0]),
+    ('', []),
+    ('!!!', []),
+])
+def test_search_terms(small_index, query, rows):
+    np.testing.assert_array_equal(np.sort(small_index.search(query)), rows)
+
+
+def test_search_rank_orders_by_term_frequency(small_index):
+    # Row 1 says "great" twice, row 0 once
+    np.testing.assert_array_equal(small_index.search('great', rank=True), [1, 0])
+
+
+@pytest.mark.parametrize('a, b', [
+    ('Great  Job', 'job great'),
+    ('"highly recommended" great', 'GREAT "Highly, recommended"'),
+    ('great-job', '"great job"'),
+])
+def test_normalize_query_equivalent(a, b):
+    assert engine.normalize_query(a) == engine.normalize_query(b)
+
+
+def test_normalize_query_keeps_phrases_distinct():
+    assert engine.normalize_query('"highly recommended"') != engine.normalize_query('highly recommended')
+    assert engine.normalize_query('"recommend highly"') != engine.normalize_query('"highly recommend"')
+
+
+def test_segmented_index_matches_single_index():
+    reviews = pd.Series([f"review {i} {'great' if i % 3 else 'fine'} work number{i % 7}" for i in range(200)],
+                        dtype=engine.REVIEW_DTYPE)
+    index = engine.SegmentedIndex([engine.ReviewIndex(reviews.iloc[:50])])
+    for start in range(50, 200, 10):
+        segment = engine.ReviewIndex(reviews.iloc[start:start + 10], row_offset=start)
+        index = index.with_segment(segment, reviews.iloc[:start + 10])
+    single = engine.ReviewIndex(reviews)
+    merged = index.merged(reviews)
+    np.testing.assert_array_equal(merged.vocab, single.vocab)
+    np.testing.assert_array_equal(merged.rows, single.rows)
+    np.testing.assert_array_equal(merged.tf, single.tf)
+    assert index.n_terms == single.n_terms
+    for query in ['great', 'number3', 'numb', '"great work"', 'fine work']:
+        np.testing.assert_array_equal(index.search(query, rank=True), single.search(query, rank=True))
+
+
+# --- regressions ---
+@pytest.mark.parametrize('text, sign', [
+    ("Can't recommend her enough!", 1),
+    ('Would not recommend.', -1),
+    ('Not great, not good enough.', -1),
+    ('Great job', 1),
+])
+def test_sentiment_negation(text, sign):
+    assert np.sign(engine.LexiconSentiment().score([text])['Sentiment'][0]) == sign
+
+
+def test_near_duplicates_keep_ratings_apart():
+    text = 'Great communication and very professional, would hire again for the next move'
+    reviews = pd.Series([text, text + '!', text, 'Something else entirely about the kitchen'])
+    ratings = pd.Series([5.0, 5.0, 1.0, 5.0])
+    clusters = engine.NearDuplicates().assign(reviews, ratings)
+    np.testing.assert_array_equal(clusters, [0, 0, 2, 3])
+    np.testing.assert_array_equal(engine.cluster_sizes(clusters), [2, 2, 1, 1])
+    np.testing.assert_array_equal(engine.cluster_sizes(clusters, np.array([True, False, True, True])), [1, 1, 1, 1])
+
+
+def test_near_duplicates_match_across_batches():
+    text = 'Packed the whole kitchen carefully and on time, highly recommended to anyone'
+    dups = engine.NearDuplicates()
+    dups.assign(pd.Series([text, 'Unrelated short note']), pd.Series([4.0, 4.0]))
+    np.testing.assert_array_equal(
+        dups.assign(pd.Series([text + '.', text]), pd.Series([4.0, 2.0]), row_offset=2), [0, 3]
+    )
+
+
+def test_collapse_clusters_counts_view_rows():
+    clusters = np.array([0, 0, 2, 0, 2, 5])
+    rows, counts = engine.collapse_clusters(np.array([5, 3, 4, 0]), clusters)
+    np.testing.assert_array_equal(rows, [5, 3, 4])
+    np.testing.assert_array_equal(counts, [1, 2, 1])
+
+
+def test_feed_cards_escape_fields():
+    page = pd.DataFrame({
+        'Date': pd.to_datetime(['2024-01-02']),
+        'Rating': [5.0],
+        'Review': ['  <script>alert(1)</script> '],
+        'Is Placeholder': [False],
+        'Domain': ['<b>Ops</b>'],
+        'Client Name': ['<img src=x>'],
+        'Category': ['A & B'],
+    })
+    html_out = engine.render_feed_cards(page)
+    for raw in ['<script>', '<b>Ops', '<img']:
+        assert raw not in html_out
+    assert '<div>"&lt;script&gt;alert(1)&lt;/script&gt;"</div>' in html_out and 'A &amp; B' in html_out
+
+
+def test_store_records_new_mtime(tmp_path):
+    csv_path = tmp_path / 'reviews.csv'
+    csv_path.write_text('Category,Date,Client Name,Rating,Review\nErrands,2024-01-02,Ann,5,Great job\n')
+    store_path = str(tmp_path / 'reviews.arrow')
+    rules = engine.DEFAULT_DOMAIN_RULES
+    engine.build_store(str(csv_path), store_path, rules)
+    stat = csv_path.stat()
+    os.utime(csv_path, (stat.st_atime, stat.st_mtime + 60))
+
+    assert engine.store_is_fresh(str(csv_path), store_path, rules)
+    assert engine.read_store_meta(store_path)['source_mtime'] == repr(csv_path.stat().st_mtime)
+
+
+def test_extend_matches_build_clusters(full, extended):
+    for column in ['Cluster', 'Cluster Size', 'Sentiment']:
+        np.testing.assert_array_equal(extended['frame'][column], full['frame'][column], err_msg=column)
+    assert (full['frame']['Cluster Size'] > 1).any()
+
+
+def test_near_duplicates_bound_bucket_candidates():
+    # One template with three words swapped: every review shares buckets with
+    # thousands of others, yet each band key keeps at most DUPLICATE_CANDIDATES texts
+    texts = templated_reviews(4000, seed=3)
+    ratings = np.full(len(texts), 5)
+    dups = engine.NearDuplicates()
+    clusters = dups.assign(texts, ratings)
+    for table, _ in dups.band_tables:
+        _, counts = np.unique(table, return_counts=True)
+        assert counts.max() <= engine.DUPLICATE_CANDIDATES
+    batched = engine.NearDuplicates()
+    parts = [batched.assign(texts.iloc[s:s + 500], ratings[s:s + 500], row_offset=s) for s in range(0, 4000, 500)]
+    np.testing.assert_array_equal(np.concatenate(parts), clusters)
+    assert len(np.unique(clusters)) < len(texts)
+
+
+# --- score cache ---
+def score_segment(n, start=0):
+    keys = np.arange(start, start + n, dtype=np.uint64) * np.uint64(2654435761)
+    return keys, {'Sentiment': np.linspace(-1, 1, n).astype(np.float32)}
+
+
+def test_score_cache_compacts_parts_while_running(tmp_path):
+    cache = engine.ScoreCache(engine.LexiconSentiment(), str(tmp_path))
+    for batch in range(40):
+        cache.add(*score_segment(10, start=batch * 10))
+        assert len(cache.part_paths()) <= engine.SCORE_CACHE_MAX_PARTS
+    reopened = engine.ScoreCache(engine.LexiconSentiment(), str(tmp_path))
+    assert reopened.part_paths() == []
+    found, cached = reopened.lookup(score_segment(400)[0])
+    assert found.all()
+    expected = np.tile(score_segment(10)[1]['Sentiment'], 40)
+    np.testing.assert_array_equal(cached['Sentiment'].astype(np.float32), expected)
+
+
+def test_score_cache_tolerates_parts_removed_by_another_process(tmp_path, monkeypatch):
+    cache = engine.ScoreCache(engine.LexiconSentiment(), str(tmp_path))
+    for batch in range(3):
+        cache.add(*score_segment(10, start=batch * 10))
+    parts = cache.part_paths()
+    # Another process compacts between this one listing the parts and removing them
+    monkeypatch.setattr(engine.ScoreCache, 'part_paths', lambda self: parts + [str(tmp_path / 'gone.arrow')])
+    os.remove(parts[0])
+    reopened = engine.ScoreCache(engine.LexiconSentiment(), str(tmp_path))
+    assert reopened.lookup(score_segment(30)[0])[0].sum() >= 20
+    assert not any(os.path.exists(p) for p in parts)
+
+
+# --- export ---
+def read_export_bytes(data, fmt):
+    if fmt == 'Parquet':
+        return pd.read_parquet(io.BytesIO(data))
+    if fmt == 'CSV (gzip)':
+        data = gzip.decompress(data)
+    if fmt == 'JSONL':
+        if not data:
+            return pd.DataFrame(columns=engine.EXPORT_COLUMNS)
+        return pd.read_json(io.BytesIO(data), lines=True, dtype=False, convert_dates=False)
+    return pd.read_csv(io.BytesIO(data), dtype={'Date': str, 'Client Name': str, 'Review': str, 'Category': str})
+
+
+def exported_values(frame):
+    # Compared as strings: CSV and JSONL carry dates as text, Parquet as date32
+    frame = frame[engine.EXPORT_COLUMNS].reset_index(drop=True)
+    return frame.assign(
+        Date=pd.to_datetime(frame['Date']).dt.strftime('%Y-%m-%d'),
+        Rating=frame['Rating'].astype('float64'),
+    ).astype({col: 'object' for col in ['Category', 'Client Name', 'Review']}).where(frame.notna(), None)
+
+
+@pytest.mark.parametrize('fmt', list(engine.EXPORT_FORMATS))
+@pytest.mark.parametrize('rows', [None, 'selection', 'empty'])
+def test_export_round_trip(full, fmt, rows):
+    frame = full['frame']
+    if rows == 'selection':
+        rows = full['orders']['Client (A-Z)'][::7]
+    elif rows == 'empty':
+        rows = np.array([], dtype=np.int64)
+    chunks = list(engine.export_chunks(frame, fmt, rows=rows, chunk_rows=128))
+    expected = frame if rows is None else frame.iloc[rows]
+    # One chunk per 128 rows, plus the Parquet footer or gzip trailer
+    assert len(chunks) >= -(-len(expected) // 128)
+    got = read_export_bytes(b''.join(chunks), fmt)
+    assert list(got.columns) == engine.EXPORT_COLUMNS
+    assert_frame_equal(exported_values(got), exported_values(expected), check_dtype=False)
+
+
+# --- reliability metrics ---
+def test_wilson_interval():
+    low, high = engine.wilson_interval([0, 5, 10, 0], [10, 10, 10, 0])
+    np.testing.assert_allclose(low[:3], [0.0, 0.2366, 0.7225], atol=1e-4)
+    np.testing.assert_allclose(high[:3], [0.2775, 0.7634, 1.0], atol=1e-4)
+    # No trials: no interval rather than an error
+    assert np.isnan(low[3]) and np.isnan(high[3])
+
+
+@pytest.mark.parametrize('domains, categories', SELECTIONS)
+def test_headline_metrics_match_rows(full, domains, categories):
+    frame = full['frame']
+    rating = frame['Rating'][engine.selection_mask(frame, domains, categories)].astype('float64')
+    rated = rating.dropna()
+    metrics = engine.headline_metrics(full['rollup'], domains, categories)
+    assert (metrics['reviews'], metrics['rated']) == (len(rating), len(rated))
+    assert metrics['composite_rating'] == round(rated.mean(), 2)
+    assert metrics['five_star'] == (rated == 5).sum()
+    assert metrics['at_risk'] == (rated < engine.RISK_BELOW).sum()
+    assert metrics['risk_low'] <= metrics['risk_rate'] <= metrics['risk_high']
+
+
+def test_headline_metrics_empty_selection(full):
+    metrics = engine.headline_metrics(full['rollup'], domains=[])
+    assert metrics['reviews'] == metrics['rated'] == metrics['at_risk'] == 0
+    assert metrics['composite_rating'] is None and metrics['risk_low'] is None
+
+
+@pytest.mark.parametrize('by', ['Domain', 'Category'])
+def test_rolling_sla_matches_rows(full, by):
+    frame = full['frame']
+    sla = engine.rolling_sla(full['rollup'], by=by)
+    summary = engine.sla_summary(sla).set_index('Group')
+    latest = sla['Period'].max()
+    start = latest - pd.DateOffset(months=engine.SLA_WINDOW_MONTHS - 1)
+    window = frame[frame['Date'].between(start, latest + pd.offsets.MonthEnd(0)) & frame['Rating'].notna()]
+    expected = window.groupby(window[by].astype(str))['Rating'].agg(
+        Rated='size', **{'At Risk': lambda r: (r < engine.RISK_BELOW).sum()}
+    )
+    assert_frame_equal(summary[['Rated', 'At Risk']].sort_index(), expected.sort_index(), check_names=False, check_dtype=False)
+    assert (sla['Rated'] > 0).all()
+    assert (summary['SLA Score'] <= summary['Reliability']).all()
+    assert (summary['Meets SLA'] == (summary['SLA Score'] >= engine.SLA_TARGET)).all()
+
+
+def test_rolling_sla_empty_selection(full):
+    sla = engine.rolling_sla(full['rollup'], domains=[])
+    assert sla.empty and list(sla.columns) == ['Group', 'Period', 'Rated', 'At Risk', 'Reliability', 'SLA Score', 'Meets SLA']
+    assert engine.sla_summary(sla).empty
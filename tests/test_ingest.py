@@ -0,0 +1,238 @@
+import json
+import threading
+
+import pytest
+
+import engine
+
+HEADER = 'Category,Date,Client Name,Rating,Review\n'
+ROWS = [
+    'Packing & Unpacking,2024-01-02,Ann B.,5,Great job packing the kitchen\n',
+    'Photography,2024-01-05,Carl D.,5,Beautiful photos of the event\n',
+    'Computer Help,2024-01-09,Eve F.,4,Fixed the printer quickly\n',
+]
+
+
+def row(name, date='2024-02-01', category='Errands', rating=5, review='Very helpful'):
+    return f'{category},{date},{name},{rating},{review}\n'
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    # Score caches and the domain rules file resolve against the working directory
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'reviews.csv').write_text(HEADER + ''.join(ROWS))
+    return tmp_path
+
+
+@pytest.fixture
+def live(workdir):
+    dataset = engine.LiveDataset(str(workdir / 'reviews.csv'), str(workdir / 'incoming'))
+    yield dataset
+    if dataset.reloading is not None:
+        dataset.reloading.join()
+
+
+def append(path, text):
+    with open(path, 'a') as f:
+        f.write(text)
+
+
+def names(dataset):
+    return sorted(dataset.features['frame']['Client Name'].astype(str))
+
+
+# --- LiveDataset.poll ---
+def test_poll_without_changes(live):
+    version = live.version
+    assert live.poll() == 0
+    assert live.version == version and live.last_ingest is None
+
+
+def test_poll_waits_for_partial_line(live, workdir):
+    csv_path = workdir / 'reviews.csv'
+    append(csv_path, row('Gus H.') + 'Errands,2024-02-03,Half Wr')
+    assert live.poll() == 1
+    assert live.offsets[str(csv_path)] == csv_path.stat().st_size - len('Errands,2024-02-03,Half Wr')
+
+    append(csv_path, 'itten,5,Done\n')
+    assert live.poll() == 1
+    assert live.offsets[str(csv_path)] == csv_path.stat().st_size
+    assert 'Half Written' in names(live)
+    assert live.poll() == 0
+
+
+def test_poll_skips_known_and_repeated_reviews(live, workdir):
+    # Same client, day and category as a loaded row, and the same new row twice
+    append(workdir / 'reviews.csv', ROWS[0] + row('Ida J.') + row('Ida J.'))
+    assert live.poll() == 1
+    added, skipped, _ = live.last_ingest
+    assert (added, skipped) == (1, 2)
+    assert len(live.features['frame']) == len(ROWS) + 1
+
+
+def test_poll_reads_inbox_csv_and_jsonl(live, workdir):
+    inbox = workdir / 'incoming'
+    inbox.mkdir()
+    (inbox / 'batch.csv').write_text(HEADER + row('Kim L.') + row('Lou M.'))
+    record = {'Category': 'Errands', 'Date': '2024-03-01', 'Client Name': 'Max N.', 'Rating': 5, 'Review': 'Quick'}
+    (inbox / 'batch.jsonl').write_text(json.dumps(record) + '\n')
+    assert live.poll() == 3
+
+    # Only the appended line is parsed; the CSV header was remembered
+    append(inbox / 'batch.jsonl', json.dumps({**record, 'Client Name': 'Ned O.'}) + '\n')
+    append(inbox / 'batch.csv', row('Oli P.'))
+    assert live.poll() == 2
+    assert {'Kim L.', 'Lou M.', 'Max N.', 'Ned O.', 'Oli P.'} <= set(names(live))
+
+
+def test_rewritten_csv_reloads(live, workdir):
+    csv_path = workdir / 'reviews.csv'
+    # Same size, different bytes before the consumed offset
+    csv_path.write_text(HEADER + ''.join(ROWS).replace('Ann B.', 'Zoe B.'))
+    assert live.poll() == 0
+    live.reloading.join()
+    assert 'Zoe B.' in names(live) and 'Ann B.' not in names(live)
+
+
+def test_truncated_csv_reloads(live, workdir):
+    (workdir / 'reviews.csv').write_text(HEADER + ROWS[0])
+    live.poll()
+    live.reloading.join()
+    assert names(live) == ['Ann B.']
+    append(workdir / 'reviews.csv', row('Pia Q.'))
+    assert live.poll() == 1
+
+
+def test_rules_edit_reloads_off_the_rerun_path(live, workdir, monkeypatch):
+    features, version = live.features, live.version
+    release = threading.Event()
+    build = engine.build_features
+
+    def slow_build(df, *args, **kwargs):
+        release.wait(10)
+        return build(df, *args, **kwargs)
+
+    monkeypatch.setattr(engine, 'build_features', slow_build)
+    (workdir / engine.DOMAIN_RULES_FILE).write_text('Pattern,Domain\nerrand,Everyday\npacking,Everyday\n')
+
+    # Returns while the rebuild is still blocked, serving the old features
+    assert live.poll() == 0
+    assert live.reloading.is_alive()
+    assert live.features is features
+    append(workdir / 'reviews.csv', row('Quin R.'))
+    assert live.poll() == 0
+
+    release.set()
+    live.reloading.join()
+    assert live.version == version + 1
+    domains = live.features['frame'].set_index('Client Name')['Domain'].astype(str)
+    assert domains['Ann B.'] == 'Everyday'
+    # The rebuild re-read the CSV, including the row appended meanwhile
+    assert 'Quin R.' in names(live)
+    assert live.poll() == 0
+
+
+def test_failed_rules_reload_keeps_serving(live, workdir):
+    features = live.features
+    (workdir / engine.DOMAIN_RULES_FILE).write_text('not,a\n"rules file')
+    live.poll()
+    live.reloading.join()
+    assert live.features is features and live.reload_error
+    # Not retried on every rerun
+    assert live.poll() == 0 and not live.reloading.is_alive()
+
+
+# --- multi-source loading ---
+URL = 'https://reviews.example/export.jsonl'
+
+
+def jsonl(*names):
+    return ''.join(
+        json.dumps({'Category': 'Errands', 'Date': '2024-04-01', 'Client Name': n, 'Rating': 5, 'Review': 'Great'}) + '\n'
+        for n in names
+    ).encode()
+
+
+class FakeFetch:
+    # Stands in for fetch_url: serves `body`, or raises while `error` is set
+    def __init__(self, body):
+        self.body, self.error, self.calls = body, None, 0
+
+    def __call__(self, url):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return self.body, 'application/x-ndjson'
+
+
+@pytest.fixture
+def sources(workdir):
+    folder = workdir / 'exports'
+    folder.mkdir()
+    (folder / 'a.jsonl').write_text(jsonl('Rae S.', 'Sam T.').decode())
+    (folder / 'notes.txt').write_text('ignored')
+    return [str(workdir / 'reviews.csv'), str(folder), URL, str(workdir / 'missing.csv')]
+
+
+def test_read_sources(sources):
+    fetch = FakeFetch(jsonl('Tia U.'))
+    results = {r[0]: r for r in engine.read_sources(sources, engine.DEFAULT_DOMAIN_RULES, fetch, workers=2)}
+    assert [len(results[s][1]) for s in sources[:3]] == [len(ROWS), 2, 1]
+    assert all(results[s][3] is None for s in sources[:3])
+    frame, fingerprint, error = results[sources[3]][1:4]
+    assert frame is None and fingerprint is None and error.startswith('FileNotFoundError')
+    assert set(results[sources[1]][1]['Domain'].astype(str)) == {engine.DEFAULT_DOMAIN}
+
+
+def test_read_sources_skips_unchanged_fingerprints(sources, workdir):
+    fetch = FakeFetch(jsonl('Tia U.'))
+    rules = engine.DEFAULT_DOMAIN_RULES
+    first = engine.read_sources(sources[:3], rules, fetch)
+    fingerprints = {source: fingerprint for source, _, fingerprint, _, _ in first}
+    again = engine.read_sources(sources[:3], rules, fetch, fingerprints=fingerprints)
+    assert [frame for _, frame, _, _, _ in again] == [None, None, None]
+
+    append(workdir / 'exports' / 'a.jsonl', jsonl('Uma V.').decode())
+    fetch.body = jsonl('Tia U.', 'Vic W.')
+    changed = {r[0]: r[1] for r in engine.read_sources(sources[:3], rules, fetch, fingerprints=fingerprints)}
+    assert changed[sources[0]] is None
+    assert len(changed[sources[1]]) == 3 and len(changed[URL]) == 2
+
+
+def test_merge_sources_keeps_first_copy_across_sources():
+    rules = engine.DEFAULT_DOMAIN_RULES
+    first = engine.prepare_frame(engine.read_export(jsonl('Ann B.', 'Bo C.', 'Bo C.'), 'a.jsonl'), rules)
+    second = engine.read_export(jsonl('Bo C.', 'Cy D.'), 'b.jsonl').assign(Review='Copy')
+    merged, skipped = engine.merge_sources([first, None, engine.prepare_frame(second, rules)])
+    # Repeats within a source are kept; the second source's copy of Bo C. is not
+    assert skipped == 1
+    assert list(merged['Client Name'].astype(str)) == ['Ann B.', 'Bo C.', 'Bo C.', 'Cy D.']
+    assert list(merged['Review'].astype(str)) == ['Great', 'Great', 'Great', 'Copy']
+    assert engine.merge_sources([None]) is None
+
+
+def test_failed_source_keeps_last_good_rows(sources):
+    fetch = FakeFetch(jsonl('Tia U.'))
+    dataset = engine.MultiSourceDataset(sources, refresh_interval=0, fetch=fetch)
+    assert 'Tia U.' in names(dataset)
+    assert dataset.missing_sources() == [sources[3]]
+    loaded_at = dataset.status[URL]['loaded_at']
+
+    fetch.error = OSError('connection reset')
+    version = dataset.version
+    assert dataset.refresh() is False
+    assert dataset.version == version and 'Tia U.' in names(dataset)
+    assert dataset.errors()[URL] == 'OSError: connection reset'
+    assert dataset.missing_sources() == [sources[3]]
+    status = dataset.status_frame().set_index('Source')
+    assert status.loc[URL, 'Rows'] == 1 and status.loc[URL, 'Loaded'] == loaded_at
+
+    fetch.error, fetch.body = None, jsonl('Tia U.', 'Wes X.')
+    assert dataset.refresh() is True
+    assert URL not in dataset.errors() and 'Wes X.' in names(dataset)
+
+
+def test_no_loadable_source(workdir):
+    with pytest.raises(OSError, match='no review source'):
+        engine.MultiSourceDataset([str(workdir / 'missing.csv')], refresh_interval=0)